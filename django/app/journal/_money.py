@@ -0,0 +1,18 @@
+"""
+Money helpers for the journal app.
+
+The stdlib `decimal` module is already C-accelerated; what costs time is
+round-tripping values through str() before handing them to Decimal.
+ORM DecimalFields are Decimal already, so only floats need converting.
+"""
+from decimal import Decimal
+
+
+def D(x) -> Decimal:
+    """Coerce x to Decimal without re-parsing values that already are one."""
+    if isinstance(x, Decimal):
+        return x
+    if isinstance(x, (int, str)):
+        return Decimal(x)
+    # float (or anything else): repr() is the shortest round-tripping form
+    return Decimal(repr(x))
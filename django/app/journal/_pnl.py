@@ -0,0 +1,197 @@
+"""
+Fill-stream P/L kernel for the journal app.
+
+Pure function over plain (action, quantity, price, commission) rows so it can
+be fed from values_list() tuples, prefetched TradeFill objects or a data
+migration alike, without touching the ORM.
+
+Units: quantities and positions are plain ints throughout (Decimal * int is
+exact, so no Decimal(qty) is ever built). Prices and money stay Decimal: the
+average cost (avg * pos + px * qty) / new_pos is generally not a whole number
+of 1e-4 price ticks, so integer fixed-point would have to round it on every
+scale-in and drift realized P/L by cents on larger size; floats would need
+the same re-rounding.
+
+No JIT/compiled dependency: the kernel is plain Python over C-accelerated
+decimal, so there is no first-request warm-up and nothing optional to fall
+back from.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+# Same values as TradeFill.ACTION_BUY / ACTION_SELL (kept ORM-free here)
+BUY = "BUY"
+SELL = "SELL"
+
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+_PRICE_4DP = Decimal("0.0001")
+
+# Trade columns denormalized from the fill stream (see fill_cache_values)
+FILL_CACHE_FIELDS = (
+    "realized_gross_cached",
+    "realized_net_cached",
+    "comm_total_cached",
+    "vwap_entry_cached",
+    "vwap_exit_cached",
+    "max_abs_pos_cached",
+)
+
+
+def fold_fills(rows, entry_action, exit_action):
+    """
+    Single pass over ordered fill rows producing every fill-derived stat:
+      - entry/exit buckets by trade side (qty, notional, commissions) for VWAPs
+      - signed position (BUY +, SELL -) and max absolute size
+      - realized gross P/L using average-cost (reducing fills realize P/L;
+        a flip through zero opens the new direction at the fill price)
+    Defensive: ignores nonsensical fills (qty<=0, price<=0).
+    Returns dict of Decimals/ints (money totals quantized to cents).
+    """
+    entry_qty = 0
+    exit_qty = 0
+    entry_notional = _ZERO
+    exit_notional = _ZERO
+
+    comm_total = _ZERO
+    comm_entry = _ZERO
+    comm_exit = _ZERO
+
+    net_qty = 0      # signed remaining position over all fills with qty > 0
+    pos = 0          # signed position over valid fills (average-cost engine)
+    max_abs_pos = 0
+    avg_cost = None  # Decimal average cost for current open position
+    realized = _ZERO
+
+    # Pre-bound locals; each fill's action is classified once (is_buy)
+    buy, sell = BUY, SELL
+    entry_is_buy = entry_action == buy
+
+    # Rows come straight from NOT NULL columns (int quantity, Decimal price and
+    # commission), so values are used as-is without per-fill coercion.
+    for action, qty, price, c in rows:
+        if qty <= 0:
+            continue
+        if action == buy:
+            is_buy = True
+            net_qty += qty
+        elif action == sell:
+            is_buy = False
+            net_qty -= qty
+        else:
+            is_buy = None
+
+        if price <= 0:
+            continue
+
+        # commissions
+        if c:
+            comm_total += c
+
+        if is_buy is None:
+            # Unknown action: only its commission counts
+            continue
+
+        # entry/exit buckets based on trade side
+        if is_buy == entry_is_buy:
+            entry_qty += qty
+            entry_notional += price * qty
+            if c:
+                comm_entry += c
+        else:
+            exit_qty += qty
+            exit_notional += price * qty
+            if c:
+                comm_exit += c
+
+        if is_buy:
+            if pos < 0:
+                # BUY reduces a short: short profit = (avg_cost - buy_price) * closing
+                closing = min(qty, -pos)
+                realized += (avg_cost - price) * closing
+                pos += closing
+                if pos == 0:
+                    avg_cost = None
+                qty_left = qty - closing
+                if qty_left > 0:
+                    # Flip to long: remaining qty is a new position at this price
+                    pos += qty_left
+                    avg_cost = price
+            else:
+                # Adding/increasing long
+                new_pos = pos + qty
+                if pos == 0 or avg_cost is None:
+                    avg_cost = price
+                else:
+                    avg_cost = ((avg_cost * pos) + (price * qty)) / new_pos
+                pos = new_pos
+
+        else:
+            if pos > 0:
+                # SELL reduces a long: long profit = (sell_price - avg_cost) * closing
+                closing = min(qty, pos)
+                realized += (price - avg_cost) * closing
+                pos -= closing
+                if pos == 0:
+                    avg_cost = None
+                qty_left = qty - closing
+                if qty_left > 0:
+                    # Flip to short: remaining qty is a new short position at this price
+                    pos -= qty_left
+                    avg_cost = price
+            else:
+                # Adding/increasing short
+                new_pos = pos - qty
+                if pos == 0 or avg_cost is None:
+                    avg_cost = price
+                else:
+                    avg_cost = ((avg_cost * -pos) + (price * qty)) / -new_pos
+                pos = new_pos
+
+        abs_pos = pos if pos >= 0 else -pos
+        if abs_pos > max_abs_pos:
+            max_abs_pos = abs_pos
+
+    return {
+        "entry_qty": entry_qty,
+        "exit_qty": exit_qty,
+        "entry_notional": entry_notional,
+        "exit_notional": exit_notional,
+        "comm_total": comm_total.quantize(_CENT, rounding=ROUND_HALF_UP),
+        "comm_entry": comm_entry.quantize(_CENT, rounding=ROUND_HALF_UP),
+        "comm_exit": comm_exit.quantize(_CENT, rounding=ROUND_HALF_UP),
+        "realized_gross": realized.quantize(_CENT, rounding=ROUND_HALF_UP),
+        "avg_cost": avg_cost if pos != 0 else None,
+        "pos": net_qty,
+        "max_abs_pos": max_abs_pos,
+    }
+
+
+def vwap(notional, qty):
+    """Volume-weighted average price at price precision (4dp); None if qty <= 0."""
+    if qty <= 0:
+        return None
+    return (notional / qty).quantize(_PRICE_4DP, rounding=ROUND_HALF_UP)
+
+
+def fill_cache_values(side, rows):
+    """
+    Values for Trade's *_cached columns from a trade's ordered fill rows.
+    All None when there are no fills: readers then use the legacy columns.
+    """
+    rows = list(rows)
+    if not rows:
+        return dict.fromkeys(FILL_CACHE_FIELDS)
+    entry_action, exit_action = (BUY, SELL) if side == "LONG" else (SELL, BUY)
+    return cache_values_from_stats(fold_fills(rows, entry_action, exit_action))
+
+
+def cache_values_from_stats(s):
+    """Map fold_fills() output onto Trade's *_cached columns."""
+    return {
+        "realized_gross_cached": s["realized_gross"],
+        "realized_net_cached": (s["realized_gross"] - s["comm_total"]).quantize(_CENT, rounding=ROUND_HALF_UP),
+        "comm_total_cached": s["comm_total"],
+        "vwap_entry_cached": vwap(s["entry_notional"], s["entry_qty"]),
+        "vwap_exit_cached": vwap(s["exit_notional"], s["exit_qty"]),
+        "max_abs_pos_cached": s["max_abs_pos"],
+    }
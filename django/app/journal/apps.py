@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JournalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'journal'
+
+    def ready(self):
+        # Register signal receivers (fill -> Trade cached P/L columns, tag list cache)
+        from . import signals  # noqa: F401
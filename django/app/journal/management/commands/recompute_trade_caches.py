@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+from journal.models import Trade
+
+
+class Command(BaseCommand):
+    help = "Recompute fill-derived Trade columns (cached P/L, commission totals) in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only trades of this user id")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        qs = Trade.objects.all()
+        if opts["user"]:
+            qs = qs.filter(user_id=opts["user"])
+        n = Trade.recompute_many(qs, batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {n} trades"))
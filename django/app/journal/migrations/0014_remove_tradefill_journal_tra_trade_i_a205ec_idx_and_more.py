@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-16 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0013_alter_attachment_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tradefill',
+            name='journal_tra_trade_i_a205ec_idx',
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['journal_day', 'status'], name='journal_tra_journal_f324ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['user', 'entry_time'], name='journal_tra_user_id_c2e101_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradefill',
+            index=models.Index(fields=['trade', 'timestamp', 'id'], name='journal_tra_trade_i_b87615_idx'),
+        ),
+    ]
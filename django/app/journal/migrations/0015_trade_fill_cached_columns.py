@@ -0,0 +1,171 @@
+# Generated by Django 5.2.9 on 2026-10-16 10:40
+
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import groupby
+
+from django.db import migrations, models
+
+# Frozen copy of journal._pnl as of this migration: historical migrations must
+# not follow later changes (or renames) of the live app module.
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+_PRICE_4DP = Decimal("0.0001")
+
+FILL_CACHE_FIELDS = (
+    "realized_gross_cached",
+    "realized_net_cached",
+    "comm_total_cached",
+    "vwap_entry_cached",
+    "vwap_exit_cached",
+    "max_abs_pos_cached",
+)
+
+
+def _fold_fills(rows, entry_is_buy):
+    """Average-cost fold over ordered (action, quantity, price, commission) rows."""
+    entry_qty = exit_qty = 0
+    entry_notional = exit_notional = _ZERO
+    comm_total = _ZERO
+    pos = 0
+    max_abs_pos = 0
+    avg_cost = None
+    realized = _ZERO
+
+    for action, qty, price, c in rows:
+        if qty <= 0 or price <= 0:
+            continue
+        if c:
+            comm_total += c
+        if action == "BUY":
+            is_buy = True
+        elif action == "SELL":
+            is_buy = False
+        else:
+            continue
+
+        if is_buy == entry_is_buy:
+            entry_qty += qty
+            entry_notional += price * qty
+        else:
+            exit_qty += qty
+            exit_notional += price * qty
+
+        if is_buy:
+            if pos < 0:
+                closing = min(qty, -pos)
+                realized += (avg_cost - price) * closing
+                pos += closing
+                if pos == 0:
+                    avg_cost = None
+                if qty - closing > 0:
+                    pos += qty - closing
+                    avg_cost = price
+            else:
+                new_pos = pos + qty
+                avg_cost = price if pos == 0 or avg_cost is None else ((avg_cost * pos) + (price * qty)) / new_pos
+                pos = new_pos
+        else:
+            if pos > 0:
+                closing = min(qty, pos)
+                realized += (price - avg_cost) * closing
+                pos -= closing
+                if pos == 0:
+                    avg_cost = None
+                if qty - closing > 0:
+                    pos -= qty - closing
+                    avg_cost = price
+            else:
+                new_pos = pos - qty
+                avg_cost = price if pos == 0 or avg_cost is None else ((avg_cost * -pos) + (price * qty)) / -new_pos
+                pos = new_pos
+
+        max_abs_pos = max(max_abs_pos, abs(pos))
+
+    return entry_qty, exit_qty, entry_notional, exit_notional, comm_total, realized, max_abs_pos
+
+
+def _vwap(notional, qty):
+    if qty <= 0:
+        return None
+    return (notional / qty).quantize(_PRICE_4DP, rounding=ROUND_HALF_UP)
+
+
+def fill_cache_values(side, rows):
+    """Values for Trade's *_cached columns from a trade's ordered fill rows."""
+    entry_qty, exit_qty, entry_notional, exit_notional, comm, realized, max_abs_pos = _fold_fills(
+        rows, entry_is_buy=(side == "LONG")
+    )
+    gross = realized.quantize(_CENT, rounding=ROUND_HALF_UP)
+    comm = comm.quantize(_CENT, rounding=ROUND_HALF_UP)
+    return {
+        "realized_gross_cached": gross,
+        "realized_net_cached": (gross - comm).quantize(_CENT, rounding=ROUND_HALF_UP),
+        "comm_total_cached": comm,
+        "vwap_entry_cached": _vwap(entry_notional, entry_qty),
+        "vwap_exit_cached": _vwap(exit_notional, exit_qty),
+        "max_abs_pos_cached": max_abs_pos,
+    }
+
+
+def backfill_fill_caches(apps, schema_editor):
+    """Populate the *_cached columns for every trade that already has fills."""
+    Trade = apps.get_model("journal", "Trade")
+    TradeFill = apps.get_model("journal", "TradeFill")
+
+    sides = dict(Trade.objects.values_list("id", "side"))
+    rows = (
+        TradeFill.objects.order_by("trade_id", "timestamp", "id")
+        .values_list("trade_id", "action", "quantity", "price", "commission")
+        .iterator(chunk_size=2000)
+    )
+
+    batch = []
+    for trade_id, fills in groupby(rows, key=lambda r: r[0]):
+        vals = fill_cache_values(sides[trade_id], (r[1:] for r in fills))
+        batch.append(Trade(pk=trade_id, **vals))
+        if len(batch) >= 500:
+            Trade.objects.bulk_update(batch, FILL_CACHE_FIELDS)
+            batch = []
+    if batch:
+        Trade.objects.bulk_update(batch, FILL_CACHE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0014_remove_tradefill_journal_tra_trade_i_a205ec_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trade',
+            name='comm_total_cached',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='max_abs_pos_cached',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='realized_gross_cached',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='realized_net_cached',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='vwap_entry_cached',
+            field=models.DecimalField(decimal_places=4, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='vwap_exit_cached',
+            field=models.DecimalField(decimal_places=4, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_fill_caches, migrations.RunPython.noop),
+    ]
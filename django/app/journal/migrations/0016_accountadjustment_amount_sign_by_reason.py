@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-16 14:05
+
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_adjustment_signs(apps, schema_editor):
+    """
+    Apply the serializer's sign-by-reason rule to existing rows so the constraint
+    can be added. Every flipped row is logged (id, reason, old amount) before the
+    UPDATE: the reverse is a no-op, so the log is the record of what changed.
+    """
+    AccountAdjustment = apps.get_model("journal", "AccountAdjustment")
+    wrong_sign = AccountAdjustment.objects.filter(
+        models.Q(reason="DEPOSIT", amount__lt=0)
+        | models.Q(reason__in=["WITHDRAWAL", "FEE"], amount__gt=0)
+    )
+    rows = list(wrong_sign.order_by("id").values_list("id", "reason", "amount"))
+    if not rows:
+        return
+    for pk, reason, amount in rows:
+        logger.warning(
+            "AccountAdjustment %s (%s): amount %s -> %s to match its reason", pk, reason, amount, -amount
+        )
+    logger.warning("Flipped the sign of %d AccountAdjustment row(s)", len(rows))
+    AccountAdjustment.objects.filter(pk__in=[r[0] for r in rows]).update(amount=-models.F("amount"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0015_trade_fill_cached_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_adjustment_signs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='accountadjustment',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('amount__lt', 0), ('reason', 'DEPOSIT'), _negated=True), models.Q(('amount__gt', 0), ('reason__in', ['WITHDRAWAL', 'FEE']), _negated=True)), name='adjustment_amount_sign_by_reason'),
+        ),
+    ]
@@ -1,7 +1,22 @@
+from collections import defaultdict
+from itertools import islice
+
 from django.db import models
+from django.db.models.functions import Abs, Coalesce, NullIf, Round
 from django.conf import settings
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from ._money import D
+from ._pnl import FILL_CACHE_FIELDS, cache_values_from_stats, fill_cache_values, fold_fills, vwap
+
+# Shared Decimal constants (avoid re-parsing literals on every call)
+_ZERO = Decimal("0")
+_ZERO_CENTS = Decimal("0.00")
+_CENT = Decimal("0.01")
+_HUNDRED = Decimal("100")
+_PRICE_4DP = Decimal("0.0001")  # price precision (decimal_places=4)
 
 class Emotion(models.TextChoices):
     NEUTRAL = "NEUTRAL", "Neutral"
@@ -50,17 +65,17 @@ class UserSettings(models.Model):
         Returned as money rounded to cents.
         """
         try:
-            notional_d = Decimal(str(notional or 0))
-            val = Decimal(str(self.commission_value or 0))
+            notional_d = D(notional or 0)
+            val = D(self.commission_value or 0)
             if val <= 0:
-                return Decimal("0.00")
+                return _ZERO_CENTS
             if self.commission_mode == self.COMMISSION_PCT:
-                fee = notional_d * (val / Decimal("100"))
+                fee = notional_d * (val / _HUNDRED)
             else:
                 fee = val
-            return fee.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            return fee.quantize(_CENT, rounding=ROUND_HALF_UP)
         except Exception:
-            return Decimal("0.00")
+            return _ZERO_CENTS
 
     def commission_for_side(self, price: Decimal, quantity: int) -> Decimal:
         """
@@ -72,37 +87,36 @@ class UserSettings(models.Model):
         Returned as money rounded to cents.
         """
         try:
-            px = Decimal(str(price or 0))
+            px = D(price or 0)
             qty = int(quantity or 0)
             if px <= 0 or qty <= 0:
-                return Decimal("0.00")
+                return _ZERO_CENTS
 
-            notional = px * Decimal(qty)
+            notional = px * qty
 
             if self.commission_mode in (self.COMMISSION_PCT, self.COMMISSION_FIXED):
                 return self.commission_for_notional(notional)
 
             if self.commission_mode == self.COMMISSION_PER_SHARE:
-                per_share = Decimal(str(self.commission_per_share or 0))
+                per_share = D(self.commission_per_share or 0)
                 if per_share <= 0:
-                    return Decimal("0.00")
+                    return _ZERO_CENTS
 
-                fee = per_share * Decimal(qty)
+                fee = per_share * qty
 
-                min_fee = Decimal(str(self.commission_min_per_side or 0))
+                min_fee = D(self.commission_min_per_side or 0)
                 if min_fee > 0:
                     fee = max(fee, min_fee)
 
-                cap_pct = Decimal(str(self.commission_cap_pct_of_notional or 0))
+                cap_pct = D(self.commission_cap_pct_of_notional or 0)
                 if cap_pct > 0:
-                    cap = notional * (cap_pct / Decimal("100"))
-                    fee = min(fee, cap)
+                    fee = min(fee, notional * (cap_pct / _HUNDRED))
 
-                return fee.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                return fee.quantize(_CENT, rounding=ROUND_HALF_UP)
 
-            return Decimal("0.00")
+            return _ZERO_CENTS
         except Exception:
-            return Decimal("0.00")
+            return _ZERO_CENTS
 
     def __str__(self):
         return f"Settings({self.user})"
@@ -116,7 +130,84 @@ class StrategyTag(models.Model):
     def __str__(self):
         return self.name
 
-class JournalDay(models.Model):
+def _safe_float(x):
+    """float(x), keeping NULL columns as None."""
+    return float(x) if x is not None else None
+
+
+def _fills_already_prefetched(trade) -> bool:
+    """True when trade.fills was loaded by prefetch_related (no query needed)."""
+    return "fills" in getattr(trade, "_prefetched_objects_cache", {})
+
+
+class CachedPropertiesMixin:
+    """
+    Models with @cached_property derived values list them in _CACHED_PROPERTIES.
+    The memoized values are dropped on refresh_from_db() and can be cleared
+    explicitly via _invalidate_cached_properties() after in-place mutations.
+    Loading a deferred field (also a refresh_from_db(fields=[...]) call) keeps
+    them: nothing memoized can have read a column that wasn't loaded yet.
+    """
+    _CACHED_PROPERTIES = ()
+
+    def _invalidate_cached_properties(self):
+        for name in self._CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        only_deferred = fields is not None and set(fields) <= self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if not only_deferred:
+            self._invalidate_cached_properties()
+
+
+class JournalDayQuerySet(models.QuerySet):
+    def with_aggregates(self):
+        """
+        Annotate the day-level sums as correlated subqueries (no GROUP BY on the
+        day rows, no trades loaded):
+          - realized_net_db: Σ NET P/L of CLOSED trades (Trade.realized_net_expression),
+            excluding trades with fills but no cached value yet
+          - realized_uncached_db: how many CLOSED trades were excluded that way
+          - adjustments_total_db: Σ adjustments
+        Read by realized_pnl_decimal / adjustments_total.
+        """
+        closed = (
+            Trade.objects.filter(journal_day=models.OuterRef("pk"), status="CLOSED")
+            .alias(has_fills=models.Exists(TradeFill.objects.filter(trade=models.OuterRef("pk"))))
+            .order_by()
+            .values("journal_day")
+        )
+        uncached_q = models.Q(has_fills=True, realized_net_cached__isnull=True)
+        realized = closed.annotate(
+            s=models.Sum(Trade.realized_net_expression(), filter=~uncached_q)
+        ).values("s")
+        uncached = closed.annotate(n=models.Count("pk", filter=uncached_q)).values("n")
+        adjustments = (
+            AccountAdjustment.objects.filter(journal_day=models.OuterRef("pk"))
+            .order_by()
+            .values("journal_day")
+            .annotate(s=models.Sum("amount"))
+            .values("s")
+        )
+        return self.annotate(
+            realized_net_db=Coalesce(
+                models.Subquery(realized),
+                models.Value(_ZERO_CENTS),
+                output_field=models.DecimalField(max_digits=18, decimal_places=2),
+            ),
+            realized_uncached_db=Coalesce(
+                models.Subquery(uncached), models.Value(0), output_field=models.IntegerField()
+            ),
+            adjustments_total_db=Coalesce(
+                models.Subquery(adjustments),
+                models.Value(_ZERO_CENTS),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+
+class JournalDay(CachedPropertiesMixin, models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="journal_days")
     date = models.DateField()
     day_start_equity = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -125,62 +216,84 @@ class JournalDay(models.Model):
 
     notes = models.TextField(blank=True)
 
+    objects = JournalDayQuerySet.as_manager()
+
+    _CACHED_PROPERTIES = (
+        "realized_net_db", "realized_uncached_db", "adjustments_total_db",
+        "adjustments_total", "realized_pnl_decimal", "effective_equity", "realized_pnl",
+        "_user_settings", "max_daily_loss_pct", "max_trades", "breach_daily_loss",
+    )
+
     class Meta:
         unique_together = ("user", "date")
         ordering = ["-date"]
 
-    @property
+    @cached_property
     def adjustments_total(self) -> Decimal:
-        # Sum of all adjustments linked to this JournalDay (nullable until model exists)
-        total = Decimal("0")
-        if hasattr(self, "adjustments"):
-            for a in self.adjustments.all():
-                total += a.amount
-        return total
-
-    @property
+        # Sum of all adjustments linked to this JournalDay: annotated by
+        # with_aggregates(), otherwise a single aggregate query
+        annotated = self.__dict__.get("adjustments_total_db")
+        if annotated is not None:
+            return annotated
+        return self.adjustments.aggregate(s=models.Sum("amount"))["s"] or _ZERO
+
+    @cached_property
+    def realized_pnl_decimal(self) -> Decimal:
+        """
+        NET realized P/L from CLOSED trades, computed once per instance and
+        shared by realized_pnl and effective_equity.
+
+        - One conditional aggregate (Trade.realized_net_total) sums the
+          cached net of trades with fills and the closed-form net of legacy
+          trades, and counts trades with fills but no cached value yet (e.g.
+          fills written with bulk_create, which skips signals).
+        - Only if that count is non-zero are those trades folded in Python.
+        When loaded via JournalDay.objects.with_aggregates(), the sum and count
+        are already annotated and no query is issued here unless a trade still
+        needs folding.
+        """
+        annotated = self.__dict__.get("realized_net_db")
+        presummed = None if annotated is None else (annotated, self.__dict__.get("realized_uncached_db"))
+        return Trade.realized_net_total(self.trades.filter(status="CLOSED"), presummed=presummed)
+
+    @cached_property
     def effective_equity(self) -> Decimal:
         """
         Effective equity used by risk checks:
         day_start_equity + realized P/L from CLOSED trades (NET) + Σ adjustments_today
         """
-        start = Decimal(str(self.day_start_equity or 0))
-        realized = Decimal("0")
-        for t in self.trades.filter(status="CLOSED"):
-            # Use trade.realized_pnl which is NET of commissions (float)
-            try:
-                realized += Decimal(str(t.realized_pnl or 0))
-            except Exception:
-                continue
-        return start + realized + self.adjustments_total
-
-    @property
+        start = D(self.day_start_equity or 0)
+        return start + self.realized_pnl_decimal + self.adjustments_total
+
+    @cached_property
     def realized_pnl(self):
         """Realized P/L for the day from CLOSED trades only (NET)."""
-        total = 0.0
-        for t in self.trades.filter(status="CLOSED"):
-            try:
-                total += float(t.realized_pnl or 0.0)
-            except Exception:
-                continue
-        return round(total, 2)
-
-    @property
+        return round(float(self.realized_pnl_decimal), 2)
+
+    @cached_property
+    def _user_settings(self):
+        """Owner's UserSettings, fetched once per instance (None if never created)."""
+        try:
+            return self.user.settings
+        except UserSettings.DoesNotExist:
+            return None
+
+    @cached_property
     def max_daily_loss_pct(self):
         # convenience mirror from settings at time of viewing (UI uses this)
         try:
-            return float(self.user.settings.max_daily_loss_pct)
+            return float(self._user_settings.max_daily_loss_pct)
         except Exception:
             return 0.0
 
-    @property
+    @cached_property
     def max_trades(self):
         try:
-            return int(self.user.settings.max_trades_per_day)
+            return int(self._user_settings.max_trades_per_day)
         except Exception:
             return 0
 
-    @property
+    @cached_property
     def breach_daily_loss(self):
         try:
             start = float(self.day_start_equity or 0)
@@ -188,7 +301,7 @@ class JournalDay(models.Model):
             if start <= 0:
                 return False
             loss_pct = ((start - end) / start) * 100.0
-            return loss_pct >= float(self.user.settings.max_daily_loss_pct)
+            return loss_pct >= float(self._user_settings.max_daily_loss_pct)
         except Exception:
             return False
 
@@ -197,7 +310,7 @@ class JournalDay(models.Model):
     def __str__(self):
         return f"{self.user} {self.date}"
 
-class Trade(models.Model):
+class Trade(CachedPropertiesMixin, models.Model):
     SIDE_CHOICES = [
         ("LONG", "Long"),
         ("SHORT", "Short"),
@@ -212,6 +325,10 @@ class Trade(models.Model):
         ordering = ["-entry_time"]
         indexes = [
             models.Index(fields=["user", "status", "exit_time"]),
+            # Day-scoped P/L queries: trades of a JournalDay by status
+            models.Index(fields=["journal_day", "status"]),
+            # Default ordering (-entry_time) for a user's trade list
+            models.Index(fields=["user", "entry_time"]),
         ]
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="trades")
@@ -240,22 +357,76 @@ class Trade(models.Model):
     commission_entry = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0"))
     commission_exit = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0"))
 
+    # Fill-derived values denormalized by _recompute_fill_caches() whenever a
+    # TradeFill is saved/deleted (journal.signals). NULL = no fills.
+    # bulk_create()/QuerySet.update()/bulk_update() on TradeFill send no signals:
+    # callers must follow them with Trade.recompute_many() for the affected trades.
+    realized_gross_cached = models.DecimalField(max_digits=14, decimal_places=2, null=True, editable=False)
+    realized_net_cached = models.DecimalField(max_digits=14, decimal_places=2, null=True, editable=False)
+    comm_total_cached = models.DecimalField(max_digits=12, decimal_places=2, null=True, editable=False)
+    vwap_entry_cached = models.DecimalField(max_digits=10, decimal_places=4, null=True, editable=False)
+    vwap_exit_cached = models.DecimalField(max_digits=10, decimal_places=4, null=True, editable=False)
+    max_abs_pos_cached = models.PositiveIntegerField(null=True, editable=False)
+
     # ----------------------------
     # Scaling support via TradeFill
     # ----------------------------
     def _has_fills(self) -> bool:
-        try:
-            return hasattr(self, "fills") and self.fills.exists()
-        except Exception:
+        """
+        Whether the trade has any fills, answered without a query when possible
+        (prefetched fills, populated cache columns) and memoized otherwise.
+        Cleared with the other derived values (see _CACHED_PROPERTIES).
+        """
+        if _fills_already_prefetched(self):
+            # Reuse the prefetched list instead of issuing EXISTS
+            return bool(self.fills.all())
+        cached = self.__dict__.get("_has_fills_cached")
+        if cached is not None:
+            return cached
+        if self.pk is None:
             return False
-
-    def _fills_ordered(self):
+        # Non-NULL cache columns imply fills (skip if the column was deferred)
+        if self.__dict__.get("realized_net_cached") is not None:
+            has = True
+        else:
+            has = self.fills.exists()
+        self.__dict__["_has_fills_cached"] = has
+        return has
+
+    def _fill_rows(self):
         """
-        Deterministic ordering for P/L computations.
-        Order by timestamp then id to stabilize equal timestamps.
+        (action, quantity, price, commission) rows in deterministic P/L order:
+        timestamp then id, to stabilize equal timestamps.
         """
-        return self.fills.all().order_by("timestamp", "id")
-    
+        if _fills_already_prefetched(self):
+            # Prefetched fills already follow TradeFill.Meta.ordering (timestamp, id)
+            return [(f.action, f.quantity, f.price, f.commission) for f in self.fills.all()]
+        # Plain tuples: no model instances for a read-only fold
+        return self.fills.order_by("timestamp", "id").values_list(
+            "action", "quantity", "price", "commission"
+        )
+
+    def _fill_cache_ready(self) -> bool:
+        """
+        CLOSED trades read fill-derived values from the *_cached columns;
+        OPEN trades (fills still changing) fold the fills instead.
+        """
+        return self.status == "CLOSED" and self.realized_net_cached is not None
+
+    def _recompute_fill_caches(self):
+        """Refold the current fills and write every *_cached column in one UPDATE."""
+        # Always read from the DB: a prefetched fills list may predate the change
+        rows = (
+            TradeFill.objects.filter(trade_id=self.pk)
+            .order_by("timestamp", "id")
+            .values_list("action", "quantity", "price", "commission")
+        )
+        vals = fill_cache_values(self.side, rows)
+        Trade.objects.filter(pk=self.pk).update(**vals)
+        for name, val in vals.items():
+            setattr(self, name, val)
+        self._invalidate_cached_properties()
+
     def _entry_action(self) -> str:
         # "Entry side" action depends on trade side
         # LONG: BUY opens/increases, SHORT: SELL opens/increases
@@ -265,117 +436,47 @@ class Trade(models.Model):
         # "Exit side" action depends on trade side
         return TradeFill.ACTION_SELL if self.side == "LONG" else TradeFill.ACTION_BUY
 
-    def _fills_summary(self):
-        """
-        Single pass summary for trader-friendly stats.
-        Assumptions:
-          - No flips (or rare). If flips happen, VWAP entry/exit still reflects side actions,
-            but realized P/L uses average-cost logic separately.
-        Returns dict of Decimals/ints.
-        """
-        entry_action = self._entry_action()
-        exit_action = self._exit_action()
-
-        entry_qty = 0
-        exit_qty = 0
-        entry_notional = Decimal("0")
-        exit_notional = Decimal("0")
-
-        comm_total = Decimal("0")
-        comm_entry = Decimal("0")
-        comm_exit = Decimal("0")
-
-        # position tracking for max size
-        pos = 0  # signed (BUY +, SELL -)
-        max_abs_pos = 0
-
-        for f in self._fills_ordered():
-            try:
-                qty = int(f.quantity or 0)
-                if qty <= 0:
-                    continue
-                px = Decimal(str(f.price or 0))
-                if px <= 0:
-                    continue
-            except Exception:
-                continue
-
-            # commissions
-            c = Decimal(str(f.commission or 0))
-            if c:
-                comm_total += c
-
-            # entry/exit buckets based on trade side
-            if f.action == entry_action:
-                entry_qty += qty
-                entry_notional += (px * Decimal(qty))
-                if c:
-                    comm_entry += c
-            elif f.action == exit_action:
-                exit_qty += qty
-                exit_notional += (px * Decimal(qty))
-                if c:
-                    comm_exit += c
-
-            # position tracking (BUY +, SELL - always)
-            if f.action == TradeFill.ACTION_BUY:
-                pos += qty
-            elif f.action == TradeFill.ACTION_SELL:
-                pos -= qty
-            if abs(pos) > max_abs_pos:
-                max_abs_pos = abs(pos)
-
-        return {
-            "entry_qty": entry_qty,
-            "exit_qty": exit_qty,
-            "entry_notional": entry_notional,
-            "exit_notional": exit_notional,
-            "comm_total": comm_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
-            "comm_entry": comm_entry.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
-            "comm_exit": comm_exit.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
-            "max_abs_pos": int(max_abs_pos),
-        }
-
-    @property
+    def _compute_all_from_fills(self):
+        """All fill-derived stats in one pass (see _pnl.fold_fills)."""
+        return fold_fills(self._fill_rows(), self._entry_action(), self._exit_action())
+
+    @cached_property
+    def _fill_stats(self):
+        """
+        Memoized _compute_all_from_fills(): every fill-derived property reads this.
+        None when the trade has no fills (or a fill value Decimal can't use);
+        properties then fall back to the legacy columns.
+        """
+        if not self._has_fills():
+            return None
+        try:
+            return self._compute_all_from_fills()
+        except (InvalidOperation, TypeError, ValueError):
+            return None
+
+    @cached_property
     def position_qty_signed(self) -> int:
         """
         Signed remaining position quantity computed from fills.
         LONG: +qty is long, SHORT: -qty is short.
         If no fills exist, falls back to legacy Trade.quantity (signed by side).
         """
-        try:
-            if not self._has_fills():
-                base = int(self.quantity or 0)
-                return base if self.side == "LONG" else -base
-
-            pos = 0
-            for f in self._fills_ordered():
-                qty = int(f.quantity or 0)
-                if qty <= 0:
-                    continue
-
-                if f.action == TradeFill.ACTION_BUY:
-                    pos += qty
-                elif f.action == TradeFill.ACTION_SELL:
-                    pos -= qty
-
-            # For short trades, we still represent short as negative.
-            # The fill stream should already reflect the correct direction
-            # (SELL to open => negative pos). We keep it as-is.
-            return int(pos)
-        except Exception:
+        s = self._fill_stats
+        if s is None:
             base = int(self.quantity or 0)
             return base if self.side == "LONG" else -base
 
-    @property
+        # For short trades, we still represent short as negative.
+        # The fill stream should already reflect the correct direction
+        # (SELL to open => negative pos). We keep it as-is.
+        return s["pos"]
+
+    @cached_property
     def position_qty(self) -> int:
         """Absolute remaining position size (shares/contracts)."""
-        try:
-            return abs(int(self.position_qty_signed))
-        except Exception:
-            return int(self.quantity or 0)
+        return abs(self.position_qty_signed)
 
-    @property
+    @cached_property
     def avg_entry_price(self):
         """
         Average open cost of the remaining position computed from fills (float),
@@ -383,399 +484,399 @@ class Trade(models.Model):
 
         Backward-compatible fallback: returns legacy entry_price if no fills exist.
         """
-        try:
-            if not self._has_fills():
-                return float(self.entry_price) if self.entry_price is not None else None
-
-            pos = Decimal("0")  # signed position
-            avg_cost = None     # Decimal
-
-            for f in self._fills_ordered():
-                qty = int(f.quantity or 0)
-                if qty <= 0:
-                    continue
-                price = Decimal(str(f.price or 0))
-                if price <= 0:
-                    continue
-
-                # BUY increases pos; SELL decreases pos (signed).
-                if f.action == TradeFill.ACTION_BUY:
-                    new_pos = pos + Decimal(qty)
-                    if pos == 0:
-                        avg_cost = price
-                    else:
-                        # If adding in same direction (pos >= 0), average; if crossing, keep simple.
-                        # Crossing behavior will be disallowed/validated in Phase 2.
-                        if pos > 0 and new_pos > 0:
-                            avg_cost = ((avg_cost * pos) + (price * Decimal(qty))) / new_pos
-                        elif pos < 0:
-                            # Buying reduces a short; avg_cost unchanged while reducing.
-                            pass
-                        else:
-                            # Crossing through zero: reset avg_cost to the fill price for new direction.
-                            avg_cost = price
-                    pos = new_pos
-
-                elif f.action == TradeFill.ACTION_SELL:
-                    new_pos = pos - Decimal(qty)
-                    if pos == 0:
-                        avg_cost = price
-                    else:
-                        if pos < 0 and new_pos < 0:
-                            # Adding to a short (more negative): average short "entry" price.
-                            avg_cost = ((avg_cost * abs(pos)) + (price * Decimal(qty))) / abs(new_pos)
-                        elif pos > 0:
-                            # Selling reduces a long; avg_cost unchanged while reducing.
-                            pass
-                        else:
-                            # Crossing through zero: reset avg_cost to the fill price for new direction.
-                            avg_cost = price
-                    pos = new_pos
-
-            if pos == 0 or avg_cost is None:
-                return None
-
-            # Quantize to 4dp for UI consistency with entry_price field
-            return float(avg_cost.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP))
-        except Exception:
-            try:
-                return float(self.entry_price) if self.entry_price is not None else None
-            except Exception:
-                return None
-    @property
+        s = self._fill_stats
+        if s is None:
+            return _safe_float(self.entry_price)
+
+        avg_cost = s["avg_cost"]
+        if avg_cost is None:
+            return None
+
+        # Quantize to 4dp for UI consistency with entry_price field
+        return float(avg_cost.quantize(_PRICE_4DP, rounding=ROUND_HALF_UP))
+
+    @cached_property
     def vwap_entry(self):
         """
         VWAP of ALL entry-side fills (scale-ins), regardless of current position.
         This is the 'true' average entry a trader expects to see after scaling.
         """
-        try:
-            if not self._has_fills():
-                return float(self.entry_price) if self.entry_price is not None else None
-            s = self._fills_summary()
-            if s["entry_qty"] <= 0:
-                return None
-            v = (s["entry_notional"] / Decimal(s["entry_qty"])).quantize(
-                Decimal("0.0001"), rounding=ROUND_HALF_UP
-            )
-            return float(v)
-        except Exception:
-            return None
-
-    @property
+        if self._fill_cache_ready():
+            return _safe_float(self.vwap_entry_cached)
+        s = self._fill_stats
+        if s is None:
+            return _safe_float(self.entry_price)
+        return _safe_float(vwap(s["entry_notional"], s["entry_qty"]))
+
+    @cached_property
     def vwap_exit(self):
         """
         VWAP of ALL exit-side fills (scale-outs).
         On a fully closed trade, this is the 'true' average exit.
         """
-        try:
-            if not self._has_fills():
-                return float(self.exit_price) if self.exit_price is not None else None
-            s = self._fills_summary()
-            if s["exit_qty"] <= 0:
-                return None
-            v = (s["exit_notional"] / Decimal(s["exit_qty"])).quantize(
-                Decimal("0.0001"), rounding=ROUND_HALF_UP
-            )
-            return float(v)
-        except Exception:
-            return None
-
-    @property
+        if self._fill_cache_ready():
+            return _safe_float(self.vwap_exit_cached)
+        s = self._fill_stats
+        if s is None:
+            return _safe_float(self.exit_price)
+        return _safe_float(vwap(s["exit_notional"], s["exit_qty"]))
+
+    @cached_property
     def total_entry_qty(self) -> int:
-        try:
-            if not self._has_fills():
-                return int(self.quantity or 0)
-            return int(self._fills_summary()["entry_qty"])
-        except Exception:
+        s = self._fill_stats
+        if s is None:
             return int(self.quantity or 0)
+        return s["entry_qty"]
 
-    @property
+    @cached_property
     def total_exit_qty(self) -> int:
-        try:
-            if not self._has_fills():
-                return int(self.quantity or 0) if self.status == "CLOSED" else 0
-            return int(self._fills_summary()["exit_qty"])
-        except Exception:
-            return 0
+        s = self._fill_stats
+        if s is None:
+            return int(self.quantity or 0) if self.status == "CLOSED" else 0
+        return s["exit_qty"]
 
-    @property
+    @cached_property
     def max_position_qty(self) -> int:
         """Maximum absolute position size reached during the trade (shares/contracts)."""
-        try:
-            if not self._has_fills():
-                return int(self.quantity or 0)
-            return int(self._fills_summary()["max_abs_pos"])
-        except Exception:
+        if self._fill_cache_ready():
+            return int(self.max_abs_pos_cached or 0)
+        s = self._fill_stats
+        if s is None:
             return int(self.quantity or 0)
+        return s["max_abs_pos"]
 
-    @property
+    @cached_property
     def commission_total(self) -> float:
         """Total commissions across all fills (NET fees)."""
-        try:
-            if not self._has_fills():
-                fee_e = Decimal(str(self.commission_entry or 0))
-                fee_x = Decimal(str(self.commission_exit or 0))
-                return float((fee_e + fee_x).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
-            s = self._fills_summary()
-            return float(s["comm_total"])
-        except Exception:
-            return 0.0
-
-    @property
+        if self._fill_cache_ready():
+            return float(self.comm_total_cached)
+        s = self._fill_stats
+        if s is None:
+            fee_e = D(self.commission_entry or 0)
+            fee_x = D(self.commission_exit or 0)
+            return float((fee_e + fee_x).quantize(_CENT, rounding=ROUND_HALF_UP))
+        return float(s["comm_total"])
+
+    @cached_property
     def commission_entry_total(self) -> float:
         """Entry-side commissions summed from fills (LONG: BUY, SHORT: SELL)."""
-        try:
-            if not self._has_fills():
-                return float(Decimal(str(self.commission_entry or 0)))
-            return float(self._fills_summary()["comm_entry"])
-        except Exception:
-            return 0.0
+        s = self._fill_stats
+        if s is None:
+            return float(self.commission_entry or 0)
+        return float(s["comm_entry"])
 
-    @property
+    @cached_property
     def commission_exit_total(self) -> float:
         """Exit-side commissions summed from fills (LONG: SELL, SHORT: BUY)."""
-        try:
-            if not self._has_fills():
-                return float(Decimal(str(self.commission_exit or 0)))
-            return float(self._fills_summary()["comm_exit"])
-        except Exception:
-            return 0.0
+        s = self._fill_stats
+        if s is None:
+            return float(self.commission_exit or 0)
+        return float(s["comm_exit"])
 
-    @property
+    @cached_property
     def risk_per_share(self):
         """Absolute (entry - stop). None if not computable."""
-        try:
-            if self.stop_price is None:
-                return None
-            # Prefer fill-aware entry anchor for risk-per-share
-            entry_anchor = self.vwap_entry if self._has_fills() else (float(self.entry_price) if self.entry_price is not None else None)
-            if entry_anchor is None:
-                return None
-            rps = abs(float(entry_anchor) - float(self.stop_price))
-            return rps if rps > 0 else None
-        except Exception:
+        # Annotated by TradeViewSet (risk_per_share_expression); NULL there means
+        # the anchor needs the fill fold, so fall through to Python
+        annotated = self.__dict__.get("risk_per_share_db")
+        if annotated is not None:
+            return float(annotated)
+        if self.stop_price is None:
             return None
+        # vwap_entry is the fill-aware entry anchor (legacy entry_price without fills)
+        entry_anchor = self.vwap_entry
+        if entry_anchor is None:
+            return None
+        rps = abs(entry_anchor - float(self.stop_price))
+        return rps if rps > 0 else None
 
-    @property
+    @cached_property
     def r_multiple(self):
         """
         Per-share R multiple (price-move / risk-per-share), fill-aware.
         This is the 'classic' R that ignores size and commissions.
         """
-        try:
-            rps = self.risk_per_share
-            if rps in (None, 0):
-                return None
-            # Prefer fill-aware anchors when available
-            entry_anchor = self.vwap_entry if self._has_fills() else (float(self.entry_price) if self.entry_price is not None else None)
-            exit_anchor = self.vwap_exit if self._has_fills() else (float(self.exit_price) if self.exit_price is not None else None)
-            if exit_anchor is None or entry_anchor is None:
-                return None
-            move = float(exit_anchor) - float(entry_anchor)
-            if self.side == "SHORT":
-                move = -move
-            return round(move / float(rps), 2)
-        except Exception:
+        annotated = self.__dict__.get("r_multiple_db")
+        if annotated is not None:
+            return float(annotated)
+        rps = self.risk_per_share
+        if rps is None:
+            return None
+        # Fill-aware anchors (legacy entry/exit prices without fills)
+        entry_anchor = self.vwap_entry
+        exit_anchor = self.vwap_exit
+        if exit_anchor is None or entry_anchor is None:
             return None
-        
-    @property
+        move = exit_anchor - entry_anchor
+        if self.side == "SHORT":
+            move = -move
+        return round(move / rps, 2)
+
+    @cached_property
     def risk_dollars(self):
         """
         Risk in dollars based on:
           abs(vwap_entry - stop) * max_position_qty
         This matches trader intuition for scaled positions.
         """
-        try:
-            rps = self.risk_per_share
-            if rps in (None, 0):
-                return None
-            qty = self.max_position_qty
-            if qty <= 0:
-                return None
-            val = Decimal(str(rps)) * Decimal(qty)
-            return float(val.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
-        except Exception:
+        rps = self.risk_per_share
+        if rps is None:
+            return None
+        qty = self.max_position_qty
+        if qty <= 0:
             return None
+        val = D(rps) * qty
+        return float(val.quantize(_CENT, rounding=ROUND_HALF_UP))
 
-    @property
+    @cached_property
     def realized_gross(self) -> float:
         """Realized gross P/L from fills (or legacy), as float."""
-        try:
-            if self._has_fills():
-                realized_gross, _comm = self._realized_gross_and_commission_from_fills()
-                return float(realized_gross)
-            return float(self.gross_pnl)
-        except Exception:
-            return 0.0
+        return float(self.gross_pnl)
 
-    @property
+    @cached_property
     def r_multiple_gross_dollars(self):
         """Gross $R = gross_realized / risk_dollars."""
-        try:
-            rd = self.risk_dollars
-            if rd in (None, 0):
-                return None
-            return round(float(self.realized_gross) / float(rd), 2)
-        except Exception:
+        rd = self.risk_dollars
+        if not rd:
             return None
+        return round(self.realized_gross / rd, 2)
 
-    @property
+    @cached_property
     def r_multiple_net_dollars(self):
         """Net $R = realized_pnl (net) / risk_dollars."""
-        try:
-            rd = self.risk_dollars
-            if rd in (None, 0):
-                return None
-            return round(float(self.realized_pnl or 0.0) / float(rd), 2)
-        except Exception:
+        rd = self.risk_dollars
+        if not rd:
             return None
-        
-    @property
+        return round(self.realized_pnl / rd, 2)
+
+    @cached_property
     def gross_pnl(self) -> Decimal:
         """Gross P/L before commissions (money)."""
-        try:
-            # If fills exist, compute realized gross based on fills (average-cost method).
-            if self._has_fills():
-                realized_gross, _comm = self._realized_gross_and_commission_from_fills()
-                return realized_gross
-
-            # Legacy path
-            if self.exit_price is None or self.entry_price is None or self.quantity in (None, 0):
-                return Decimal("0.00")
-            move = Decimal(str(self.exit_price)) - Decimal(str(self.entry_price))
-            if self.side == "SHORT":
-                move = -move
-            return (move * Decimal(str(self.quantity))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        except Exception:
-            return Decimal("0.00")
-        
-    def _realized_gross_and_commission_from_fills(self):
-        """
-        Compute realized gross P/L and total commissions from fills using average-cost.
-        This returns only REALIZED P/L (from reducing position).
-
-        Notes:
-        - Scale validation (e.g., no flips) will be enforced in Phase 2 API layer.
-        - This function is defensive and will ignore nonsensical fills (qty<=0, price<=0).
-        """
-        realized = Decimal("0")
-        total_comm = Decimal("0")
-
-        pos = Decimal("0")      # signed position (BUY +, SELL -)
-        avg_cost = None         # Decimal average cost for current open position
-
-        for f in self._fills_ordered():
-            qty_i = int(f.quantity or 0)
-            if qty_i <= 0:
-                continue
-            qty = Decimal(qty_i)
-
-            price = Decimal(str(f.price or 0))
-            if price <= 0:
-                continue
-
-            comm = Decimal(str(f.commission or 0))
-            if comm:
-                total_comm += comm
-
-            if f.action == TradeFill.ACTION_BUY:
-                # BUY: increases pos; if pos < 0 it reduces short (realizes P/L)
-                if pos < 0 and avg_cost is not None:
-                    closing = min(qty, abs(pos))
-                    # Short profit: (avg_cost - buy_price) * closing
-                    realized += (avg_cost - price) * closing
-                    qty_left = qty - closing
-                    pos = pos + closing  # pos is negative; adding closing moves towards zero
-                    if pos == 0:
-                        avg_cost = None
-                    # If qty_left flips to long, treat remaining as new position at this price.
-                    if qty_left > 0:
-                        pos = pos + qty_left  # now positive
-                        avg_cost = price
-                else:
-                    # Adding/increasing long
-                    new_pos = pos + qty
-                    if pos == 0 or avg_cost is None:
-                        avg_cost = price
-                    else:
-                        # average cost only when adding in same direction
-                        if pos > 0 and new_pos > 0:
-                            avg_cost = ((avg_cost * pos) + (price * qty)) / new_pos
-                        elif pos < 0:
-                            # Buying reduces short without realizing (handled above). Defensive.
-                            pass
-                        else:
-                            avg_cost = price
-                    pos = new_pos
-
-            elif f.action == TradeFill.ACTION_SELL:
-                # SELL: decreases pos; if pos > 0 it reduces long (realizes P/L)
-                if pos > 0 and avg_cost is not None:
-                    closing = min(qty, pos)
-                    # Long profit: (sell_price - avg_cost) * closing
-                    realized += (price - avg_cost) * closing
-                    qty_left = qty - closing
-                    pos = pos - closing
-                    if pos == 0:
-                        avg_cost = None
-                    # If qty_left flips to short, treat remaining as new short position at this price.
-                    if qty_left > 0:
-                        pos = pos - qty_left  # now negative
-                        avg_cost = price
-                else:
-                    # Adding/increasing short
-                    new_pos = pos - qty
-                    if pos == 0 or avg_cost is None:
-                        avg_cost = price
-                    else:
-                        if pos < 0 and new_pos < 0:
-                            avg_cost = ((avg_cost * abs(pos)) + (price * qty)) / abs(new_pos)
-                        elif pos > 0:
-                            # Selling reduces long without realizing (handled above). Defensive.
-                            pass
-                        else:
-                            avg_cost = price
-                    pos = new_pos
-
-        realized = realized.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        total_comm = total_comm.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        return realized, total_comm
-
-
-    @property
+        if self._fill_cache_ready():
+            return self.realized_gross_cached
+        # If fills exist, compute realized gross based on fills (average-cost method).
+        s = self._fill_stats
+        if s is not None:
+            return s["realized_gross"]
+
+        # Legacy path (None-safe on its inputs)
+        return self._legacy_gross_pnl(self.side, self.entry_price, self.exit_price, self.quantity)
+
+    @staticmethod
+    def _legacy_gross_pnl(side, entry_price, exit_price, quantity) -> Decimal:
+        """Gross P/L of a legacy (no fills) trade from its raw column values."""
+        if exit_price is None or entry_price is None or quantity in (None, 0):
+            return _ZERO_CENTS
+        move = D(exit_price) - D(entry_price)
+        if side == "SHORT":
+            move = -move
+        return (move * D(quantity)).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def legacy_net_pnl_expression(prefix=""):
+        """
+        SQL twin of _legacy_net_pnl(): per-trade NET P/L from the legacy columns,
+        gross rounded to cents (Postgres ROUND is half-away-from-zero, like ROUND_HALF_UP).
+        `prefix` allows use from a related model, e.g. "trades__".
+        """
+        def f(name):
+            return models.F(prefix + name)
+
+        money = models.DecimalField(max_digits=18, decimal_places=4)
+        gross = models.Case(
+            models.When(**{prefix + "side": "SHORT"}, then=(f("entry_price") - f("exit_price")) * f("quantity")),
+            default=(f("exit_price") - f("entry_price")) * f("quantity"),
+            output_field=money,
+        )
+        gross = Coalesce(Round(gross, 2), models.Value(_ZERO_CENTS), output_field=money)
+        return gross - f("commission_entry") - f("commission_exit")
+
+    @classmethod
+    def realized_net_expression(cls, prefix=""):
+        """
+        SQL NET P/L per CLOSED trade: realized_net_cached where the fill caches
+        are populated, legacy_net_pnl_expression() otherwise. Trades with fills
+        but an empty cache must be excluded by the caller and folded in Python.
+        """
+        return models.Case(
+            models.When(
+                **{prefix + "realized_net_cached__isnull": False},
+                then=models.F(prefix + "realized_net_cached"),
+            ),
+            default=cls.legacy_net_pnl_expression(prefix),
+            output_field=models.DecimalField(max_digits=18, decimal_places=4),
+        )
+
+    @classmethod
+    def realized_net_total(cls, closed, *, presummed=None) -> Decimal:
+        """
+        NET realized P/L summed over `closed` (a queryset of CLOSED trades):
+        one conditional aggregate over realized_net_expression() that also
+        counts trades with fills but no cached value yet; only those are then
+        folded in Python. `presummed` = (sum, uncached count) when the caller
+        already has both from SQL (JournalDay.with_aggregates()).
+        """
+        closed = closed.alias(
+            has_fills=models.Exists(TradeFill.objects.filter(trade=models.OuterRef("pk")))
+        )
+        uncached_q = models.Q(has_fills=True, realized_net_cached__isnull=True)
+        if presummed is not None:
+            total, n_uncached = presummed
+        else:
+            sums = closed.aggregate(
+                net=models.Sum(cls.realized_net_expression(), filter=~uncached_q),
+                uncached=models.Count("pk", filter=uncached_q),
+            )
+            total, n_uncached = sums["net"] or _ZERO_CENTS, sums["uncached"]
+        if not n_uncached:
+            return total
+
+        uncached = (
+            closed.filter(uncached_q)
+            .only("id", "side", "status", "realized_net_cached")
+            .prefetch_related(
+                models.Prefetch("fills", queryset=TradeFill.objects.order_by("timestamp", "id"))
+            )
+        )
+        # Chunked so a large backlog of uncached trades doesn't load all fills at once
+        return total + sum(
+            (t._realized_net_decimal() for t in uncached.iterator(chunk_size=200)), _ZERO_CENTS
+        )
+
+    @staticmethod
+    def _sql_price_anchor(cached_field, legacy_field):
+        """
+        SQL twin of vwap_entry/vwap_exit where it needs no fill fold: the cached
+        VWAP of a CLOSED trade with populated caches, the legacy column of a trade
+        without fills; NULL otherwise (open trades with fills).
+        """
+        return models.Case(
+            models.When(
+                status="CLOSED", realized_net_cached__isnull=False, then=models.F(cached_field)
+            ),
+            models.When(
+                ~models.Exists(TradeFill.objects.filter(trade=models.OuterRef("pk"))),
+                then=models.F(legacy_field),
+            ),
+            default=None,
+            output_field=models.DecimalField(max_digits=10, decimal_places=4),
+        )
+
+    @classmethod
+    def risk_per_share_expression(cls):
+        """SQL twin of risk_per_share: |entry anchor - stop|, NULL when zero or not computable."""
+        return NullIf(
+            Abs(cls._sql_price_anchor("vwap_entry_cached", "entry_price") - models.F("stop_price")),
+            models.Value(_ZERO),
+        )
+
+    @classmethod
+    def r_multiple_expression(cls):
+        """SQL twin of r_multiple: side-signed (exit - entry) / risk_per_share, 2dp."""
+        entry = cls._sql_price_anchor("vwap_entry_cached", "entry_price")
+        exit_ = cls._sql_price_anchor("vwap_exit_cached", "exit_price")
+        money = models.DecimalField(max_digits=18, decimal_places=4)
+        move = models.Case(
+            models.When(side="SHORT", then=entry - exit_),
+            default=exit_ - entry,
+            output_field=money,
+        )
+        return Round(
+            models.ExpressionWrapper(move / cls.risk_per_share_expression(), output_field=money), 2
+        )
+
+    @classmethod
+    def _legacy_net_pnl(cls, side, entry_price, exit_price, quantity, commission_entry, commission_exit) -> Decimal:
+        """NET P/L of a legacy (no fills) trade from its raw column values."""
+        gross = cls._legacy_gross_pnl(side, entry_price, exit_price, quantity)
+        fee_e = D(commission_entry or 0)
+        fee_x = D(commission_exit or 0)
+        return (gross - fee_e - fee_x).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+    def _realized_net_decimal(self) -> Decimal:
+        """NET P/L (gross - commissions) as Decimal cents; summed as-is by JournalDay."""
+        if self._fill_cache_ready():
+            return self.realized_net_cached
+        # If fills exist, compute net realized from fills (realized gross - sum(fill commissions))
+        stats = self._fill_stats
+        if stats is not None:
+            return (stats["realized_gross"] - stats["comm_total"]).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+        # Legacy path (None-safe on its inputs)
+        return self._legacy_net_pnl(
+            self.side, self.entry_price, self.exit_price, self.quantity,
+            self.commission_entry, self.commission_exit,
+        )
+
+    @cached_property
     def realized_pnl(self):
         """NET P/L (gross - commissions). Returns float for API compatibility."""
-        try:
-            # If fills exist, compute net realized from fills (realized gross - sum(fill commissions))
-            if self._has_fills():
-                realized_gross, total_comm = self._realized_gross_and_commission_from_fills()
-                net = (realized_gross - total_comm).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-                return float(net)
-
-            # Legacy path
-            gross = self.gross_pnl
-            fee_e = Decimal(str(self.commission_entry or 0))
-            fee_x = Decimal(str(self.commission_exit or 0))
-            net = (gross - fee_e - fee_x).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            return float(net)
-        except Exception:
-            return 0.0
+        return float(self._realized_net_decimal())
 
     def __str__(self):
-        qty = self.position_qty if self._has_fills() else (self.quantity or 0)
+        # Display string must never hit the DB (admin changelists, logging):
+        # use the live position only when fills are already prefetched.
+        if _fills_already_prefetched(self):
+            qty = self.position_qty
+        else:
+            qty = self.quantity or 0
         return f"{self.ticker} {self.side} x{qty}"
 
-    def close(self, *, exit_price=None, exit_time=None):
-        """Helper for consistent close semantics."""
-        from django.utils import timezone
-        if self.status == "CLOSED":
-            return
-        if exit_price is not None:
-            self.exit_price = exit_price
-        if not self.exit_time:
-            self.exit_time = exit_time or timezone.now()
-        self.status = "CLOSED"
-        self.save(update_fields=["exit_price", "exit_time", "status"])
+    # Derived values memoized per instance (see @cached_property above).
+    # Must be cleared whenever the underlying columns/fills change.
+    _CACHED_PROPERTIES = (
+        "_has_fills_cached", "_fill_stats", "risk_per_share_db", "r_multiple_db",
+        "position_qty_signed", "position_qty", "avg_entry_price",
+        "vwap_entry", "vwap_exit", "total_entry_qty", "total_exit_qty", "max_position_qty",
+        "commission_total", "commission_entry_total", "commission_exit_total",
+        "risk_per_share", "r_multiple", "risk_dollars",
+        "realized_gross", "r_multiple_gross_dollars", "r_multiple_net_dollars",
+        "gross_pnl", "realized_pnl",
+    )
+
+    @classmethod
+    def recompute_many(cls, qs, batch_size=500) -> int:
+        """
+        Refresh the fill-derived columns (cached P/L + per-side commission
+        totals) for every trade in qs with bulk_update, one UPDATE per batch
+        instead of a save() per trade. Trades without fills only get their
+        cache columns cleared (their commissions are the source of truth).
+        Returns the number of trades processed.
+        """
+        fields = ["commission_entry", "commission_exit", *FILL_CACHE_FIELDS]
+        trades = qs.only("id", "side", *fields).iterator(chunk_size=batch_size)
+
+        count = 0
+        while True:
+            batch = list(islice(trades, batch_size))
+            if not batch:
+                break
+
+            # One values_list query per batch: plain tuples, no TradeFill instances
+            rows = defaultdict(list)
+            fill_rows = (
+                TradeFill.objects.filter(trade_id__in=[t.pk for t in batch])
+                .order_by("trade_id", "timestamp", "id")
+                .values_list("trade_id", "action", "quantity", "price", "commission")
+            )
+            for trade_id, *row in fill_rows:
+                rows[trade_id].append(row)
+
+            for trade in batch:
+                fills = rows.get(trade.pk)
+                if not fills:
+                    vals = dict.fromkeys(FILL_CACHE_FIELDS)
+                else:
+                    s = fold_fills(fills, trade._entry_action(), trade._exit_action())
+                    vals = cache_values_from_stats(s)
+                    vals["commission_entry"] = s["comm_entry"]
+                    vals["commission_exit"] = s["comm_exit"]
+                for name, val in vals.items():
+                    setattr(trade, name, val)
+
+            cls.objects.bulk_update(batch, fields)
+            count += len(batch)
+        return count
 
 class TradeFill(models.Model):
     """
@@ -801,7 +902,8 @@ class TradeFill(models.Model):
     class Meta:
         ordering = ["timestamp", "id"]
         indexes = [
-            models.Index(fields=["trade", "timestamp"]),
+            # Covers the (timestamp, id) P/L order per trade without a sort
+            models.Index(fields=["trade", "timestamp", "id"]),
         ]
 
     def __str__(self):
@@ -845,6 +947,16 @@ class AccountAdjustment(models.Model):
 
     class Meta:
         ordering = ("-at_time", "-id")
+        constraints = [
+            # Sign by reason (see AccountAdjustmentSerializer.validate), also for non-API writers
+            models.CheckConstraint(
+                condition=(
+                    ~models.Q(reason="DEPOSIT", amount__lt=0)
+                    & ~models.Q(reason__in=["WITHDRAWAL", "FEE"], amount__gt=0)
+                ),
+                name="adjustment_amount_sign_by_reason",
+            ),
+        ]
 
     def __str__(self):
         sign = "+" if self.amount is not None and self.amount >= 0 else ""
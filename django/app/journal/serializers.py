@@ -1,5 +1,6 @@
 # journal/serializers.py
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from .models import (
     JournalDay,
     Trade,
@@ -11,12 +12,190 @@ from .models import (
     Emotion,
 )
 
+import copy
 from decimal import Decimal
+from django.contrib.postgres.aggregates import JSONBAgg
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import CharField, F, FileField, ImageField, Prefetch, Q, Value
+from django.db.models.functions import JSONObject
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .services import get_or_create_journal_day_with_carry, get_user_settings
+from ._money import D
+
+_ZERO = Decimal("0")
+_ZERO_CENTS = Decimal("0.00")
+_PRICE_FIELDS = ("entry_price", "stop_price", "exit_price", "target_price")
+_SIDES = frozenset(("LONG", "SHORT"))
+_EMOTION_FIELDS = ("entry_emotion", "exit_emotion")
+_EMOTION_VALUES = frozenset(Emotion.values)
+# Amount sign forced by adjustment reason; reasons not listed (CORRECTION) keep the given sign
+_ADJUSTMENT_SIGN = {
+    AccountAdjustment.REASON_DEPOSIT: 1,
+    AccountAdjustment.REASON_WITHDRAWAL: -1,
+    AccountAdjustment.REASON_FEE: -1,
+}
+_MISSING = object()
+_MAX_ATTACHMENT_MB = 10
+_MAX_ATTACHMENT_BYTES = _MAX_ATTACHMENT_MB * 1024 * 1024
+# PNG, JPEG, GIF, BMP, TIFF (little/big endian) file signatures
+_IMAGE_MAGICS = (b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"BM", b"II*\x00", b"MM\x00*")
+# ISO-BMFF "ftyp" major brands of HEIF/HEIC/AVIF stills
+_FTYP_IMAGE_BRANDS = (b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif", b"avis")
+
+
+def _looks_like_image(head):
+    """Header sniff; ImageField's Pillow check still decides what is openable."""
+    if head.startswith(_IMAGE_MAGICS):
+        return True
+    # RIFF is a container (WAV/AVI too): only the WEBP form type is an image
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return True
+    return head[4:8] == b"ftyp" and head[8:12] in _FTYP_IMAGE_BRANDS
+
+
+class ReadableFieldsCacheMixin:
+    """
+    DRF already reuses one child serializer per list and deep-copies declared
+    fields once per instance; what's left per row is re-filtering fields for
+    write_only. Freeze the readable ones once per serializer instance instead.
+    """
+
+    @cached_property
+    def _readable_fields(self):
+        skip = self._skipped_readable_fields()
+        return tuple(
+            f for f in self.fields.values() if not f.write_only and f.field_name not in skip
+        )
+
+    def _skipped_readable_fields(self):
+        """Names of readable fields to leave out of this instance's output."""
+        return ()
 
-from .services import get_or_create_journal_day_with_carry
 
-class StrategyTagSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """
+    ModelSerializer.get_fields() re-introspects the model on every instantiation.
+    Build the field set once per class and give each instance a deep copy
+    (fields get bound to their parent serializer, so instances can't share them).
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        template = cls.__dict__.get("_fields_template")
+        if template is None:
+            template = super().get_fields()
+            cls._fields_template = template
+        return copy.deepcopy(template)
+
+
+class StrategyTagPKField(serializers.PrimaryKeyRelatedField):
+    """PK field over StrategyTag whose queryset is only built when validating input."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return StrategyTagPKListField(**list_kwargs)
+
+    def get_queryset(self):
+        return StrategyTag.objects.all()
+
+
+class StrategyTagPKListField(serializers.ManyRelatedField):
+    """many=True StrategyTagPKField: all submitted ids resolved with one in_bulk() query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail("incorrect_type", data_type=type(item).__name__)
+            try:
+                pks.append(StrategyTag._meta.pk.to_python(item))
+            except DjangoValidationError:
+                child.fail("incorrect_type", data_type=type(item).__name__)
+
+        found = child.get_queryset().in_bulk(pks)
+        tags = []
+        for pk in pks:
+            tag = found.get(pk)
+            if tag is None:
+                child.fail("does_not_exist", pk_value=pk)
+            tags.append(tag)
+        return tags
+
+
+def expand_params(request):
+    """?expand=a.b,c.d as a frozenset of dotted paths (empty without a request)."""
+    raw = request.query_params.get("expand", "") if request is not None else ""
+    return frozenset(p.strip() for p in raw.split(",") if p.strip())
+
+
+def _host_prefix(context):
+    """scheme://host of the current request, built once per serializer tree ("" without a request)."""
+    host = context.get("_host")
+    if host is None:
+        request = context.get("request")
+        host = request.build_absolute_uri("/")[:-1] if request else ""
+        context["_host"] = host
+    return host
+
+
+class HostPrefixedImageField(serializers.ImageField):
+    """
+    ImageField rendering relative storage URLs against _host_prefix() rather than
+    calling request.build_absolute_uri() for every file.
+    """
+
+    def to_representation(self, value):
+        # Same flow as FileField.to_representation; only the URL absolutizing differs
+        if not value:
+            return None
+        if not self.use_url:
+            return value.name
+        try:
+            url = value.url
+        except AttributeError:
+            return None
+        if url.startswith("/"):
+            return _host_prefix(self.context) + url
+        return url
+
+
+# StrategyTag's image-like attribute, resolved once on the model class (field
+# descriptor or property; None when the model has none)
+_TAG_IMAGE_ATTR = next(
+    (a for a in ("image", "icon", "thumbnail", "thumb", "logo") if hasattr(StrategyTag, a)), None
+)
+# The concrete FileField behind it, if any: only a column can be JSON-aggregated
+# with the trades (a property forces the per-tag StrategyTagSerializer path)
+_TAG_IMAGE_FIELD = next(
+    (
+        f for f in StrategyTag._meta.concrete_fields
+        if f.name == _TAG_IMAGE_ATTR and isinstance(f, FileField)
+    ),
+    None,
+)
+
+
+def _host_prefixed_url(url, context):
+    """Relative storage URLs made absolute against _host_prefix()."""
+    if url.startswith("/"):
+        return _host_prefix(context) + url
+    return url
+
+
+class StrategyTagSerializer(CachedFieldsMixin, ReadableFieldsCacheMixin, serializers.ModelSerializer):
     """
     Safe serializer for StrategyTag:
     - Always returns id, name
@@ -30,48 +209,37 @@ class StrategyTagSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "image")
 
     def get_image(self, obj):
-        # Gracefully support different possible attribute names or absence.
-        candidate = None
-        for attr in ("image", "icon", "thumbnail", "thumb", "logo"):
-            if hasattr(obj, attr):
-                candidate = getattr(obj, attr)
-                break
-        if not candidate:
+        if _TAG_IMAGE_ATTR is None:
             return None
-        try:
-            url = candidate.url if hasattr(candidate, "url") else str(candidate)
-            request = self.context.get("request")
-            if request and isinstance(url, str) and url.startswith("/"):
-                return request.build_absolute_uri(url)
-            return url
-        except Exception:
+        f = getattr(obj, _TAG_IMAGE_ATTR)
+        if not f:
             return None
+        url = f.url if hasattr(f, "url") else str(f)
+        return _host_prefixed_url(url, self.context)
+
 
+class AttachmentSerializer(CachedFieldsMixin, ReadableFieldsCacheMixin, serializers.ModelSerializer):
+    # absolute URLs in responses (helpful for reverse proxies/CDNs)
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        ImageField: HostPrefixedImageField,
+    }
 
-class AttachmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attachment
         fields = ["id", "trade", "image", "caption", "uploaded_at"]
         read_only_fields = ["uploaded_at"]
 
     def validate_image(self, f):
-        max_mb = 10
-        if f.size > max_mb * 1024 * 1024:
-            raise serializers.ValidationError(f"Max file size is {max_mb}MB")
-        ct = getattr(f, "content_type", None)
-        if ct and not ct.startswith("image/"):
+        if f.size > _MAX_ATTACHMENT_BYTES:
+            raise serializers.ValidationError(f"Max file size is {_MAX_ATTACHMENT_MB}MB")
+        # Sniff the file header instead of trusting the client's content_type
+        head = f.read(16)
+        f.seek(0)
+        if not _looks_like_image(head):
             raise serializers.ValidationError("Only image uploads allowed")
         return f
 
-    # absolute URLs in responses (helpful for reverse proxies/CDNs).
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        request = self.context.get("request")
-        img = data.get("image")
-        if request and isinstance(img, str) and img.startswith("/"):
-            data["image"] = request.build_absolute_uri(img)
-        return data
-
 class TradeFillSerializer(serializers.ModelSerializer):
 
     direction = serializers.SerializerMethodField()
@@ -130,23 +298,20 @@ class TradeScaleSerializer(serializers.Serializer):
     note = serializers.CharField(required=False, allow_blank=True, default="")
 
     def validate_price(self, val):
-        try:
-            if Decimal(str(val)) <= 0:
-                raise serializers.ValidationError("Must be greater than zero.")
-        except Exception:
-            raise serializers.ValidationError("Invalid price.")
+        # DecimalField has already parsed/validated the input into a Decimal
+        if val <= 0:
+            raise serializers.ValidationError("Must be greater than zero.")
         return val
 
 
 
 
-class TradeSerializer(serializers.ModelSerializer):
-    # READ: tags as [{id,name}]
-    strategy_tags = StrategyTagSerializer(many=True, read_only=True)
+class TradeSerializer(CachedFieldsMixin, ReadableFieldsCacheMixin, serializers.ModelSerializer):
+    # READ: tags as [{id,name,image}] (JSON-aggregated in SQL by setup_eager_loading)
+    strategy_tags = serializers.SerializerMethodField()
     # WRITE: ids map onto the same m2m
-    strategy_tag_ids = serializers.PrimaryKeyRelatedField(
+    strategy_tag_ids = StrategyTagPKField(
         many=True,
-        queryset=StrategyTag.objects.all(),
         write_only=True,
         required=False,
         source="strategy_tags",
@@ -177,9 +342,10 @@ class TradeSerializer(serializers.ModelSerializer):
     exit_time = serializers.DateTimeField(required=False, allow_null=True)
 
     # --- Emotions (explicit for API clarity) ---
-    entry_emotion = serializers.ChoiceField(choices=Emotion.choices, required=False)
+    # Plain CharFields (no per-instance choices map); values checked in validate()
+    entry_emotion = serializers.CharField(required=False)
     entry_emotion_note = serializers.CharField(required=False, allow_blank=True, default="")
-    exit_emotion = serializers.ChoiceField(choices=Emotion.choices, required=False, allow_null=True)
+    exit_emotion = serializers.CharField(required=False, allow_null=True)
     exit_emotion_note = serializers.CharField(required=False, allow_blank=True, default="")
 
     class Meta:
@@ -250,50 +416,133 @@ class TradeSerializer(serializers.ModelSerializer):
             "commission_exit",
         ]
 
+    # Heavy nested/free-text fields left out when rendered inside a JournalDay
+    # (is_nested) unless asked for with ?expand=trades.<field>
+    NESTED_OPTIONAL_FIELDS = (
+        "strategy_tags", "attachments", "notes", "entry_emotion_note", "exit_emotion_note",
+    )
+    _DEFERRABLE_TEXT_FIELDS = ("notes", "entry_emotion_note", "exit_emotion_note")
+
+    def __init__(self, *args, is_nested=False, **kwargs):
+        self.is_nested = is_nested
+        super().__init__(*args, **kwargs)
+
+    def _skipped_readable_fields(self):
+        if not self.is_nested:
+            return ()
+        expand = self.context.get("_expand")
+        if expand is None:
+            expand = self.context["_expand"] = expand_params(self.context.get("request"))
+        return {f for f in self.NESTED_OPTIONAL_FIELDS if "trades." + f not in expand}
+
+    @staticmethod
+    def setup_eager_loading(queryset, include=NESTED_OPTIONAL_FIELDS):
+        """
+        Canonical eager loading for this serializer: tags aggregated into one JSONB
+        column of the trades query (same shape as StrategyTagSerializer, image
+        from the same _TAG_IMAGE_ATTR column), attachments and the fills every derived
+        (position/VWAP/P&L) field reads prefetched. `include` limits the
+        optional nested fields loaded (see NESTED_OPTIONAL_FIELDS); free-text
+        columns not included are deferred so they never leave Postgres.
+        """
+        deferred = [f for f in TradeSerializer._DEFERRABLE_TEXT_FIELDS if f not in include]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        if "strategy_tags" in include and _TAG_IMAGE_ATTR is not None and _TAG_IMAGE_FIELD is None:
+            # Image from a Python property: render tags with StrategyTagSerializer
+            queryset = queryset.prefetch_related("strategy_tags")
+        elif "strategy_tags" in include:
+            # Stored file name here; get_strategy_tags() turns it into the URL
+            image = (
+                F(f"strategy_tags__{_TAG_IMAGE_FIELD.name}")
+                if _TAG_IMAGE_FIELD is not None
+                else Value(None, output_field=CharField())
+            )
+            queryset = queryset.annotate(
+                strategy_tags_json=JSONBAgg(
+                    JSONObject(
+                        id=F("strategy_tags__id"),
+                        name=F("strategy_tags__name"),
+                        image=image,
+                    ),
+                    filter=Q(strategy_tags__isnull=False),
+                    order_by="strategy_tags__name",
+                )
+            )
+        if "attachments" in include:
+            queryset = queryset.prefetch_related("attachments")
+        return queryset.prefetch_related("fills")
+
+    def get_strategy_tags(self, obj):
+        tags = getattr(obj, "strategy_tags_json", _MISSING)
+        if tags is _MISSING:
+            # Instance not loaded through setup_eager_loading (e.g. just created)
+            return StrategyTagSerializer(obj.strategy_tags.all(), many=True, context=self.context).data
+        if tags and _TAG_IMAGE_FIELD is not None:
+            storage = _TAG_IMAGE_FIELD.storage
+            for tag in tags:
+                name = tag["image"]
+                tag["image"] = _host_prefixed_url(storage.url(name), self.context) if name else None
+        return tags or []
+
     def _get_user_settings(self, user) -> UserSettings:
-        try:
-            obj, _ = UserSettings.objects.get_or_create(user=user)
+        # One lookup per user per request: the context is shared by every
+        # serializer in the call (incl. each item of a many=True create), and
+        # get_user_settings() reuses a row the view already loaded on request.user
+        cache = self.context.setdefault("_user_settings_cache", {})
+        obj = cache.get(user.pk)
+        if obj is not None:
             return obj
+        try:
+            obj = get_user_settings(user)
         except Exception:
             # last-resort fallback (should not happen)
-            return UserSettings(user=user)
+            obj = UserSettings(user=user)
+        cache[user.pk] = obj
+        return obj
 
-    def _calc_entry_commission(self, *, user, entry_price, quantity) -> Decimal:
+    def _calc_entry_commission(self, *, policy, entry_price, quantity) -> Decimal:
         try:
             if entry_price is None or quantity in (None, 0):
-                return Decimal("0.00")
-            policy = self._get_user_settings(user)
+                return _ZERO_CENTS
             return policy.commission_for_side(
-                price=Decimal(str(entry_price)),
+                price=D(entry_price),
                 quantity=int(quantity),
             )
         except Exception:
-            return Decimal("0.00")
+            return _ZERO_CENTS
 
-    def _calc_exit_commission(self, *, user, exit_price, quantity) -> Decimal:
+    def _calc_exit_commission(self, *, policy, exit_price, quantity) -> Decimal:
         try:
             if exit_price is None or quantity in (None, 0):
-                return Decimal("0.00")
-            policy = self._get_user_settings(user)
+                return _ZERO_CENTS
             return policy.commission_for_side(
-                price=Decimal(str(exit_price)),
+                price=D(exit_price),
                 quantity=int(quantity),
             )
         except Exception:
-            return Decimal("0.00")
+            return _ZERO_CENTS
 
 
     def validate(self, attrs):
+        # All problems reported together; prices are Decimal already (DecimalField)
+        errors = {}
         qty = attrs.get("quantity")
         if qty is not None and qty <= 0:
-            raise serializers.ValidationError({"quantity": "Must be greater than zero"})
-        for price_field in ("entry_price", "stop_price", "exit_price", "target_price"):
+            errors["quantity"] = "Must be greater than zero"
+        for price_field in _PRICE_FIELDS:
             val = attrs.get(price_field)
-            if val is not None and float(val) < 0:
-                raise serializers.ValidationError({price_field: "Must be non-negative"})
+            if val is not None and val < _ZERO:
+                errors[price_field] = "Must be non-negative"
         side = attrs.get("side")
-        if side and side not in ("LONG", "SHORT"):
-            raise serializers.ValidationError({"side": "Must be LONG or SHORT"})
+        if side and side not in _SIDES:
+            errors["side"] = "Must be LONG or SHORT"
+        for emotion_field in _EMOTION_FIELDS:
+            val = attrs.get(emotion_field)
+            if val is not None and val not in _EMOTION_VALUES:
+                errors[emotion_field] = f'"{val}" is not a valid choice.'
+        if errors:
+            raise serializers.ValidationError(errors)
         return attrs
 
     def create(self, validated_data):
@@ -301,23 +550,28 @@ class TradeSerializer(serializers.ModelSerializer):
         # Only set tags if the field was present (even an empty list means "clear all")
         sentinel = object()
         tags = validated_data.pop("strategy_tags", sentinel)
-        trade = Trade.objects.create(**validated_data)
 
-        # Commission: store entry-side commission at creation time
+        # Commission: entry-side commission computed up front so the INSERT carries it
         try:
             request = self.context.get("request")
-            user = getattr(request, "user", None) or trade.user
-            trade.commission_entry = self._calc_entry_commission(
-                user=user,
-                entry_price=trade.entry_price,
-                quantity=trade.quantity,
+            user = getattr(request, "user", None) or validated_data.get("user")
+            validated_data["commission_entry"] = self._calc_entry_commission(
+                policy=self._get_user_settings(user),
+                entry_price=validated_data.get("entry_price"),
+                quantity=validated_data.get("quantity"),
             )
-            trade.save(update_fields=["commission_entry"])
         except Exception:
             pass
 
-        if tags is not sentinel:
-            trade.strategy_tags.set(tags)
+        with transaction.atomic():
+            trade = Trade.objects.create(**validated_data)
+            # A new trade has no tag rows yet: one multi-row INSERT, no diff against the DB
+            if tags is not sentinel and tags:
+                through = Trade.strategy_tags.through
+                through.objects.bulk_create(
+                    [through(trade_id=trade.pk, strategytag_id=t.pk) for t in tags],
+                    ignore_conflicts=True,
+                )
         return trade
 
     def update(self, instance, validated_data):
@@ -330,7 +584,12 @@ class TradeSerializer(serializers.ModelSerializer):
         # Detect whether client sent tags (even an empty list) to allow clearing
         sentinel = object()
         tags = validated_data.pop("strategy_tags", sentinel)
-        
+
+        # Resolved once for both commission branches
+        request = self.context.get("request")
+        user = getattr(request, "user", None) or instance.user
+        qty = validated_data.get("quantity", instance.quantity)
+
         # ---- Overnight close enforcement (server-side safety net) ----
         new_status = validated_data.get("status", instance.status)
         if new_status == "CLOSED":
@@ -341,42 +600,64 @@ class TradeSerializer(serializers.ModelSerializer):
                 validated_data["exit_time"] = exit_time
 
             # Attach to the JournalDay of the local exit date
-            request = self.context.get("request")
-            user = getattr(request, "user", None) or instance.user
             exit_date = timezone.localdate(exit_time)
             jd, _ = get_or_create_journal_day_with_carry(user, exit_date)
             validated_data["journal_day"] = jd
-            
+
             # Commission: set exit-side fee when closing (or when exit_price is provided/changed)
-            exit_price = validated_data.get("exit_price", instance.exit_price)
-            qty = validated_data.get("quantity", instance.quantity)
             validated_data["commission_exit"] = self._calc_exit_commission(
-                user=user,
-                exit_price=exit_price,
+                policy=self._get_user_settings(user),
+                exit_price=validated_data.get("exit_price", instance.exit_price),
                 quantity=qty,
             )
 
         # If entry_price/quantity changed while trade is OPEN, recompute entry commission
         # (Keeps commission consistent with current entry notional)
-        if new_status != "CLOSED":
-            if "entry_price" in validated_data or "quantity" in validated_data:
-                request = self.context.get("request")
-                user = getattr(request, "user", None) or instance.user
-                ep = validated_data.get("entry_price", instance.entry_price)
-                qty = validated_data.get("quantity", instance.quantity)
-                validated_data["commission_entry"] = self._calc_entry_commission(
-                    user=user,
-                    entry_price=ep,
-                    quantity=qty,
-                )
+        elif "entry_price" in validated_data or "quantity" in validated_data:
+            validated_data["commission_entry"] = self._calc_entry_commission(
+                policy=self._get_user_settings(user),
+                entry_price=validated_data.get("entry_price", instance.entry_price),
+                quantity=qty,
+            )
+
+        # side flips the fills' entry/exit buckets. status only gates reading the
+        # caches (_fill_cache_ready checks it after the write below): no refold.
+        refill = "side" in validated_data and validated_data["side"] != instance.side
 
         for attr, val in validated_data.items():
             setattr(instance, attr, val)
-        instance.save()
+        # Only the columns this request touched
+        instance.save(update_fields=list(validated_data))
+        # Derived values and list annotations (R metrics) reflect the old columns
+        instance._invalidate_cached_properties()
+        if refill:
+            instance._recompute_fill_caches()
         if tags is not sentinel:
-            instance.strategy_tags.set(tags)
+            self._sync_tags(instance, tags)
         return instance
 
+    @staticmethod
+    def _sync_tags(trade, tags):
+        """
+        Write only the tag delta (nothing for the common notes/price PATCH).
+        Current ids come from the prefetch cache when tags were loaded with the trade.
+        """
+        cache = getattr(trade, "_prefetched_objects_cache", {})
+        if "strategy_tags" in cache:
+            current = {t.pk for t in cache["strategy_tags"]}
+        else:
+            current = set(trade.strategy_tags.values_list("id", flat=True))
+        wanted = {t.pk for t in tags}
+        to_remove = current - wanted
+        to_add = wanted - current
+        if to_remove:
+            trade.strategy_tags.remove(*to_remove)
+        if to_add:
+            trade.strategy_tags.add(*to_add)
+        if to_remove or to_add:
+            # The JSON tag annotation from setup_eager_loading() is now stale
+            trade.__dict__.pop("strategy_tags_json", None)
+
 class TradeDetailSerializer(TradeSerializer):
     """
     Trade detail serializer:
@@ -388,26 +669,72 @@ class TradeDetailSerializer(TradeSerializer):
         fields = list(TradeSerializer.Meta.fields) + ["fills"]
         read_only_fields = list(TradeSerializer.Meta.read_only_fields) + ["fills"]
 
-class JournalDaySerializer(serializers.ModelSerializer):
-    trades = TradeSerializer(many=True, read_only=True)
+class JournalDaySerializer(CachedFieldsMixin, ReadableFieldsCacheMixin, serializers.ModelSerializer):
+    trades = TradeSerializer(many=True, read_only=True, is_nested=True)
     realized_pnl = serializers.FloatField(read_only=True)
     breach_daily_loss = serializers.BooleanField(read_only=True)
     max_daily_loss_pct = serializers.FloatField(read_only=True)
     max_trades = serializers.IntegerField(read_only=True)
 
-    effective_equity = serializers.SerializerMethodField()
-    adjustments_total = serializers.SerializerMethodField()
+    # Money as Decimal straight from the model properties, rendered as JSON numbers
+    effective_equity = serializers.DecimalField(
+        max_digits=14, decimal_places=2, coerce_to_string=False, read_only=True
+    )
+    adjustments_total = serializers.DecimalField(
+        max_digits=14, decimal_places=2, coerce_to_string=False, read_only=True
+    )
 
     class Meta:
         model = JournalDay
-        fields = "__all__"
-        read_only_fields = ("user",)
-
-    def get_effective_equity(self, obj):
-        return float(obj.effective_equity)
+        # Same fields and order "__all__" produced, without reverse-relation introspection
+        fields = (
+            "id",
+            "trades",
+            "realized_pnl",
+            "breach_daily_loss",
+            "max_daily_loss_pct",
+            "max_trades",
+            "effective_equity",
+            "adjustments_total",
+            "date",
+            "day_start_equity",
+            "day_end_equity",
+            "notes",
+            "user",
+        )
+        read_only_fields = (
+            "user",
+            "realized_pnl",
+            "breach_daily_loss",
+            "max_daily_loss_pct",
+            "max_trades",
+            "effective_equity",
+            "adjustments_total",
+        )
 
-    def get_adjustments_total(self, obj):
-        return float(obj.adjustments_total)
+    @staticmethod
+    def setup_eager_loading(queryset, expand=frozenset()):
+        """
+        Canonical eager loading for day payloads: owner settings (risk-limit
+        fields) joined, nested trades prefetched with TradeSerializer's own set
+        (optional nested fields only when `expand` asks for them).
+        """
+        include = [f for f in TradeSerializer.NESTED_OPTIONAL_FIELDS if "trades." + f in expand]
+        trades = TradeSerializer.setup_eager_loading(Trade.objects.all(), include=include)
+        return (
+            queryset.select_related("user__settings")
+            # Every day column is rendered; of the joined owner rows only the
+            # settings behind max_daily_loss_pct / max_trades / breach_daily_loss
+            .only(
+                "id", "user", "date", "day_start_equity", "day_end_equity", "notes",
+                "user__id",
+                "user__settings__id",
+                "user__settings__user",
+                "user__settings__max_daily_loss_pct",
+                "user__settings__max_trades_per_day",
+            )
+            .prefetch_related(Prefetch("trades", queryset=trades))
+        )
 
 
 class UserSettingsSerializer(serializers.ModelSerializer):
@@ -441,27 +768,19 @@ class AccountAdjustmentSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "created_at")
 
-    
     def validate(self, attrs):
         """
         Normalize amount sign by reason to prevent mistakes:
         - DEPOSIT  -> positive
         - WITHDRAWAL / FEE -> negative
         - CORRECTION -> as provided (can be +/-)
+        Amount stays Decimal (abs() is exact); the DB enforces the same rule.
         """
-        from .models import AccountAdjustment as AA
-        amt = attrs.get("amount")
-        reason = attrs.get("reason")
-        try:
-            amt_f = float(amt)
-        except Exception:
+        amt = attrs.get("amount", getattr(self.instance, "amount", None))
+        reason = attrs.get("reason", getattr(self.instance, "reason", None))
+        if amt is None:
             raise serializers.ValidationError({"amount": "Invalid amount."})
 
-        if reason in (AA.REASON_WITHDRAWAL, AA.REASON_FEE):
-            amt_f = -abs(amt_f)
-        elif reason == AA.REASON_DEPOSIT:
-            amt_f = abs(amt_f)
-        # CORRECTION: leave as-is
-
-        attrs["amount"] = amt_f
-        return attrs
\ No newline at end of file
+        sign = _ADJUSTMENT_SIGN.get(reason)
+        attrs["amount"] = amt if sign is None else sign * abs(amt)
+        return attrs
@@ -4,7 +4,34 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Tuple
 
-from .models import JournalDay
+from django.db import IntegrityError, transaction
+
+from ._money import D
+from .models import JournalDay, UserSettings
+
+_ZERO = Decimal("0")
+
+# Serialized StrategyTag list (tags are global); dropped by journal.signals on tag changes
+STRATEGY_TAGS_CACHE_KEY = "journal:strategy_tags:v1"
+STRATEGY_TAGS_CACHE_TTL = 60 * 60
+
+
+def _carry_forward_equity(user, date) -> Decimal:
+    """Start equity for a new day: the previous day's end (or effective) equity, else 0."""
+    prev = (
+        JournalDay.objects.filter(user=user, date__lt=date)
+        .order_by("-date")
+        .first()
+    )
+    if prev is None:
+        return _ZERO
+    if prev.day_end_equity is not None:
+        return D(prev.day_end_equity)
+    # Prefer effective_equity (start + realized P/L + adjustments)
+    try:
+        return D(prev.effective_equity)
+    except Exception:
+        return D(prev.day_start_equity or 0)
 
 
 def get_or_create_journal_day_with_carry(user, date) -> Tuple[JournalDay, bool]:
@@ -14,32 +41,32 @@ def get_or_create_journal_day_with_carry(user, date) -> Tuple[JournalDay, bool]:
     overnight trade closure) create consistent JournalDays.
     """
 
-    obj, created = JournalDay.objects.get_or_create(user=user, date=date)
-
-    if created:
-        prev = (
-            JournalDay.objects.filter(user=user, date__lt=date)
-            .order_by("-date")
-            .first()
-        )
-
-        # Only auto-carry if the new day has no meaningful start equity yet.
-        try:
-            current_start = Decimal(str(obj.day_start_equity or 0))
-        except Exception:
-            current_start = Decimal("0")
-
-        if prev and current_start == Decimal("0"):
-            if prev.day_end_equity is not None:
-                carry = Decimal(str(prev.day_end_equity))
-            else:
-                # Prefer effective_equity (start + realized P/L + adjustments)
-                try:
-                    carry = Decimal(str(prev.effective_equity))
-                except Exception:
-                    carry = Decimal(str(prev.day_start_equity or 0))
-
-            obj.day_start_equity = carry
-            obj.save(update_fields=["day_start_equity"])
-
-    return obj, created
\ No newline at end of file
+    obj = JournalDay.objects.filter(user=user, date=date).first()
+    if obj is not None:
+        return obj, False
+
+    # New day: the carried equity goes into the single INSERT. A concurrent
+    # request creating the same day trips the (user, date) unique constraint;
+    # its row wins and is returned as existing.
+    carry = _carry_forward_equity(user, date)
+    try:
+        with transaction.atomic():
+            return JournalDay.objects.create(user=user, date=date, day_start_equity=carry), True
+    except IntegrityError:
+        return JournalDay.objects.get(user=user, date=date), False
+
+
+def get_user_settings(user) -> UserSettings:
+    """Return the user's UserSettings, creating the row on first use.
+
+    Reads through the `user.settings` reverse accessor, which caches the row on
+    the user instance: repeated calls within one request (same request.user)
+    cost a single query.
+    """
+    try:
+        return user.settings
+    except UserSettings.DoesNotExist:
+        obj, _ = UserSettings.objects.get_or_create(user=user)
+        # Replace the cached "no row" so later reads see the new one
+        user.settings = obj
+        return obj
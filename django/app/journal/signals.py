@@ -0,0 +1,29 @@
+# journal/signals.py
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import StrategyTag, TradeFill
+from .services import STRATEGY_TAGS_CACHE_KEY
+
+
+@receiver(post_save, sender=TradeFill)
+@receiver(post_delete, sender=TradeFill)
+def refresh_trade_fill_caches(sender, instance, **kwargs):
+    """
+    Keep Trade's *_cached columns in sync with its fill stream.
+    Bulk fill writes (bulk_create, QuerySet.update) bypass this receiver and
+    must run Trade.recompute_many() themselves.
+    """
+    origin = kwargs.get("origin")
+    if origin is not None and getattr(origin, "model", type(origin)) is not TradeFill:
+        # Cascade from deleting the trade (or its day/user): nothing left to cache
+        return
+    instance.trade._recompute_fill_caches()
+
+
+@receiver(post_save, sender=StrategyTag)
+@receiver(post_delete, sender=StrategyTag)
+def drop_strategy_tags_cache(sender, instance, **kwargs):
+    """Invalidate the cached StrategyTag list (see StrategyTagViewSet.list)."""
+    cache.delete(STRATEGY_TAGS_CACHE_KEY)
@@ -1,5 +1,6 @@
 
 import json
+from itertools import chain
 from pathlib import Path
 from django.conf import settings
 from django import template
@@ -8,6 +9,12 @@ import os
 
 register = template.Library()
 
+# Process-constant render inputs, normalized once at import
+_DEV_SERVER = (getattr(settings, "VITE_DEV_SERVER", None) or "").rstrip("/")
+_CSS_TEMPLATE = '<link rel="stylesheet" href="/static/frontend/{}"/>'
+_JS_TEMPLATE = '<script type="module" src="/static/frontend/{}"></script>'
+_PRELOAD_TEMPLATE = '<link rel="modulepreload" href="/static/frontend/{}"/>'
+
 def _manifest_candidates():
     # 1) STATIC_ROOT/frontend/manifest.json
     if getattr(settings, "STATIC_ROOT", None):
@@ -19,26 +26,53 @@ def _manifest_candidates():
     # 3) app static dir
     yield Path(getattr(settings, "BASE_DIR")) / "static" / "manifest.json"
 
-def _load_manifest():
+# Candidate locations are fixed by settings; build the paths once
+_MANIFEST_PATHS = tuple(_manifest_candidates())
 
+# Parsed manifest plus the (path, mtime) it was read from. The manifest only
+# changes on deploy, so production parses it once; DEBUG re-checks the mtime.
+_MANIFEST_CACHE = None
+_MANIFEST_KEY = None
 
 
-    for p in _manifest_candidates():
-        if p.exists():
+def _load_manifest():
+    global _MANIFEST_CACHE, _MANIFEST_KEY
+    debug = settings.DEBUG
+    if _MANIFEST_CACHE is not None and not debug:
+        return _MANIFEST_CACHE
+
+    for p in _MANIFEST_PATHS:
+        key = None
+        if debug:
             try:
-                return json.loads(p.read_text(encoding="utf-8"))
-            except Exception:
+                key = (p, p.stat().st_mtime_ns)
+            except OSError:
                 continue
+            if key == _MANIFEST_KEY:
+                return _MANIFEST_CACHE
+        # EAFP: a missing candidate costs one failed open, no separate stat
+        try:
+            with open(p, "rb") as f:
+                manifest = json.loads(f.read())
+        except Exception:
+            continue
+        _MANIFEST_CACHE, _MANIFEST_KEY = manifest, key
+        return manifest
     return None
 
+# entry -> SafeString for the manifest object in _RENDERED_FOR
+_RENDERED = {}
+_RENDERED_FOR = None
+
+
 @register.simple_tag
 def vite(entry: str = "index.html"):
+    global _RENDERED_FOR
     # Dev mode: optional Vite dev server
-    dev_server = getattr(settings, "VITE_DEV_SERVER", None)
-    if getattr(settings, "DEBUG", False) and dev_server:
+    if getattr(settings, "DEBUG", False) and _DEV_SERVER:
         tags = [
-            f'<script type="module" src="{dev_server.rstrip("/")}/@vite/client"></script>',
-            f'<script type="module" src="{dev_server.rstrip("/")}/src/main.tsx"></script>',
+            f'<script type="module" src="{_DEV_SERVER}/@vite/client"></script>',
+            f'<script type="module" src="{_DEV_SERVER}/src/main.tsx"></script>',
         ]
         return mark_safe("\n".join(tags))
 
@@ -47,27 +81,28 @@ def vite(entry: str = "index.html"):
     if not m:
         return mark_safe("<!-- vite manifest not found -->")
 
+    # Rendered tags per entry, dropped whenever a different manifest is loaded
+    if _RENDERED_FOR is not m:
+        _RENDERED.clear()
+        _RENDERED_FOR = m
+    html = _RENDERED.get(entry)
+    if html is None:
+        html = _RENDERED[entry] = _render_entry(m, entry)
+    return html
+
+
+def _render_entry(m, entry):
     item = m.get(entry) or m.get("index.html")
     if not item:
         return mark_safe("<!-- vite entry not found in manifest -->")
 
-
-    tags = []
-
-    # CSS first (from entry)
-    for css in item.get("css", []):
-        tags.append(f'<link rel="stylesheet" href="/static/frontend/{css}"/>')
-
-    # JS main file
+    # CSS first (from entry), then the JS main file, then child imports CSS.
+    # Imported chunks get modulepreload hints so the browser fetches them in
+    # parallel with the entry instead of after parsing it.
     file = item.get("file")
-    if file:
-        tags.append(f'<script type="module" src="/static/frontend/{file}"></script>')
-
-    # Child imports CSS
-    for child in item.get("imports", []):
-        imp = m.get(child)
-        if imp:
-            for css in imp.get("css", []):
-                tags.append(f'<link rel="stylesheet" href="/static/frontend/{css}"/>')
-
-    return mark_safe("\n".join(tags))
+    imports = [m[child] for child in item.get("imports", ()) if m.get(child)]
+    css_from_entry = [_CSS_TEMPLATE.format(css) for css in item.get("css", ())]
+    js = [_JS_TEMPLATE.format(file)] if file else []
+    preloads = [_PRELOAD_TEMPLATE.format(imp["file"]) for imp in imports if imp.get("file")]
+    css_from_imports = [_CSS_TEMPLATE.format(css) for imp in imports for css in imp.get("css", ())]
+    return mark_safe("\n".join(chain(css_from_entry, js, preloads, css_from_imports)))
@@ -6,10 +6,11 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.serializers import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 
+from django.core.cache import cache
 from django.utils import timezone
 
-from django.utils.timezone import now
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 from decimal import Decimal
 from django.db import transaction
 
@@ -26,8 +27,12 @@ from django.db.models import (
     IntegerField,
     FloatField,
     ExpressionWrapper,
+    Exists,
+    OuterRef,
+    Value,
+    BooleanField,
 )
-from django.db.models.functions import TruncDate
+from django.db.models.functions import Coalesce, TruncDate
 
 from .models import (
     JournalDay,
@@ -35,7 +40,6 @@ from .models import (
     TradeFill,
     StrategyTag,
     Attachment,
-    UserSettings,
     AccountAdjustment,
 )
 from .serializers import (
@@ -47,9 +51,19 @@ from .serializers import (
     StrategyTagSerializer,
     AttachmentSerializer,
     AccountAdjustmentSerializer,
+    expand_params,
 )
 
-from .services import get_or_create_journal_day_with_carry
+from .services import (
+    STRATEGY_TAGS_CACHE_KEY,
+    STRATEGY_TAGS_CACHE_TTL,
+    get_or_create_journal_day_with_carry,
+    get_user_settings,
+)
+from ._money import D
+
+_CENT = Decimal("0.01")
+_ZERO = Decimal("0")
 
 
 class Conflict(APIException):
@@ -75,37 +89,31 @@ class IsOwnerOfTrade(permissions.BasePermission):
 class UserSettingsViewSet(viewsets.ViewSet):
     """
     Per-user risk & UI settings.
-    Always scoped to request.user via get_or_create(user=request.user).
+    Always scoped to request.user via services.get_user_settings().
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request):
-        obj, _ = UserSettings.objects.get_or_create(user=request.user)
-        return Response(UserSettingsSerializer(obj).data)
+        return Response(UserSettingsSerializer(get_user_settings(request.user)).data)
 
-    @action(detail=False, methods=["patch"])
-    def me(self, request):
-        obj, _ = UserSettings.objects.get_or_create(user=request.user)
+    def _partial_save(self, request):
+        obj = get_user_settings(request.user)
         ser = UserSettingsSerializer(instance=obj, data=request.data, partial=True)
         ser.is_valid(raise_exception=True)
         ser.save()
         return Response(ser.data)
 
+    @action(detail=False, methods=["patch"])
+    def me(self, request):
+        return self._partial_save(request)
+
     def update(self, request, pk=None):
-        obj, _ = UserSettings.objects.get_or_create(user=request.user)
-        ser = UserSettingsSerializer(instance=obj, data=request.data, partial=True)
-        ser.is_valid(raise_exception=True)
-        ser.save()
-        return Response(ser.data)
+        return self._partial_save(request)
 
     # PATCH /api/journal/settings/{id}/
     def partial_update(self, request, pk=None):
-        obj, _ = UserSettings.objects.get_or_create(user=request.user)
-        ser = UserSettingsSerializer(instance=obj, data=request.data, partial=True)
-        ser.is_valid(raise_exception=True)
-        ser.save()
-        return Response(ser.data)
+        return self._partial_save(request)
 
 
 class JournalDayViewSet(viewsets.ModelViewSet):
@@ -119,7 +127,10 @@ class JournalDayViewSet(viewsets.ModelViewSet):
     serializer_class = JournalDaySerializer
 
     def get_queryset(self):
-        qs = JournalDay.objects.filter(user=self.request.user)
+        qs = JournalDaySerializer.setup_eager_loading(
+            JournalDay.objects.filter(user=self.request.user).with_aggregates(),
+            expand=expand_params(self.request),
+        )
         start = self.request.query_params.get("start")
         end = self.request.query_params.get("end")
         if start and end:
@@ -209,7 +220,7 @@ class TradeViewSet(viewsets.ModelViewSet):
         "ticker": ["iexact", "icontains"],
         "side": ["exact"],
     }
-    ordering_fields = ["entry_time", "exit_time", "ticker", "id"]
+    ordering_fields = ["entry_time", "exit_time", "ticker", "id", "risk_per_share_db", "r_multiple_db"]
     ordering = ["-entry_time"]  # default when no ?ordering=… is provided
     search_fields = ["ticker", "notes"]
 
@@ -225,38 +236,35 @@ class TradeViewSet(viewsets.ModelViewSet):
 
 
     def get_queryset(self):
-        qs = (
-            Trade.objects.filter(user=self.request.user)
-            .prefetch_related(
-                "strategy_tags",
-                "fills",
-                "attachments",
-            )
-        )
+        # ?journal_day= / ?status= are applied by DjangoFilterBackend (filterset_fields)
         params = self.request.query_params
-
-        # existing filters
-        day_id = params.get("journal_day")
-        status_f = params.get("status")
-        if day_id:
-            qs = qs.filter(journal_day_id=day_id)
-        if status_f:
-            qs = qs.filter(status=status_f)
+        flt = {"user": self.request.user}
 
         # ---- compatibility aliases for date filtering ----
         # Support ?date=YYYY-MM-DD
         exact_date = params.get("date")
         if exact_date:
-            qs = qs.filter(journal_day__date=exact_date)
+            flt["journal_day__date"] = exact_date
 
         # Support ?date_from=&date_to= (mapped to gte/lte on journal_day__date)
         date_from = params.get("date_from")
         date_to = params.get("date_to")
         if date_from:
-            qs = qs.filter(journal_day__date__gte=date_from)
+            flt["journal_day__date__gte"] = date_from
         if date_to:
-            qs = qs.filter(journal_day__date__lte=date_to)
+            flt["journal_day__date__lte"] = date_to
 
+        qs = TradeSerializer.setup_eager_loading(
+            Trade.objects.filter(**flt).annotate(
+                # R metrics in SQL (sortable); NULL rows fall back to the model properties
+                risk_per_share_db=Trade.risk_per_share_expression(),
+                r_multiple_db=Trade.r_multiple_expression(),
+            )
+        )
+        # Actions that dereference trade.journal_day get it in the same query;
+        # list payloads only render journal_day_id, so they skip the JOIN
+        if getattr(self, "action", None) in ("update", "partial_update", "scale"):
+            qs = qs.select_related("journal_day")
         return qs
 
     def perform_create(self, serializer):
@@ -266,7 +274,22 @@ class TradeViewSet(viewsets.ModelViewSet):
 
         # --- Risk checks (entry only; never block closes) ---
         # Always have a policy row; prevents hard-failing with "not configured"
-        policy, _ = UserSettings.objects.get_or_create(user=self.request.user)
+        policy = get_user_settings(self.request.user)
+
+        # One aggregate over the day's trades answers both the daily-loss and the
+        # trades-per-day guard. The realized sum is handed to the day the way
+        # JournalDay.objects.with_aggregates() annotates it, so effective_equity /
+        # realized_pnl_decimal below reuse it instead of querying again.
+        uncached_q = Q(has_fills=True, realized_net_cached__isnull=True)
+        day_stats = day.trades.alias(
+            has_fills=Exists(TradeFill.objects.filter(trade=OuterRef("pk")))
+        ).aggregate(
+            total=Count("pk"),
+            net=Sum(Trade.realized_net_expression(), filter=Q(status="CLOSED") & ~uncached_q),
+            uncached=Count("pk", filter=Q(status="CLOSED") & uncached_q),
+        )
+        day.realized_net_db = day_stats["net"] or _ZERO
+        day.realized_uncached_db = day_stats["uncached"]
 
         qty = serializer.validated_data.get("quantity") or 0
         entry = serializer.validated_data.get("entry_price")
@@ -308,14 +331,8 @@ class TradeViewSet(viewsets.ModelViewSet):
             pass
 
         # Daily loss guard (uses effective equity)
-        # realized PnL today from CLOSED trades
-        todays_closed = day.trades.filter(status="CLOSED")
-        realized = 0.0
-        for t in todays_closed:
-            try:
-                realized += float(t.realized_pnl or 0.0)
-            except Exception:
-                continue
+        # realized PnL today from CLOSED trades (NET, from the aggregate above)
+        realized = float(day.realized_pnl_decimal)
 
         eff_eq_for_loss = float(day.effective_equity or 0.0)
         if eff_eq_for_loss > 0 and policy.max_daily_loss_pct is not None:
@@ -338,7 +355,7 @@ class TradeViewSet(viewsets.ModelViewSet):
 
         # Trades-per-day guard
         if policy.max_trades_per_day:
-            open_or_closed_today = day.trades.count()
+            open_or_closed_today = day_stats["total"]
             if open_or_closed_today >= int(policy.max_trades_per_day):
                 detail = {
                     "code": "RISK_VIOLATION_MAX_TRADES",
@@ -376,7 +393,7 @@ class TradeViewSet(viewsets.ModelViewSet):
                 action=bootstrap_action,
                 quantity=int(trade.quantity),
                 price=Decimal(str(trade.entry_price)),
-                commission=Decimal(str(trade.commission_entry or 0)).quantize(Decimal("0.01")),
+                commission=D(trade.commission_entry or 0).quantize(_CENT),
                 note="(bootstrap from legacy entry)",
             )
 
@@ -407,8 +424,8 @@ class TradeViewSet(viewsets.ModelViewSet):
 
         # Commission compatibility: store entry/exit totals from fills
         try:
-            trade.commission_entry = Decimal(str(trade.commission_entry_total or 0)).quantize(Decimal("0.01"))
-            trade.commission_exit = Decimal(str(trade.commission_exit_total or 0)).quantize(Decimal("0.01"))
+            trade.commission_entry = D(trade.commission_entry_total or 0).quantize(_CENT)
+            trade.commission_exit = D(trade.commission_exit_total or 0).quantize(_CENT)
         except Exception:
             pass
 
@@ -434,7 +451,7 @@ class TradeViewSet(viewsets.ModelViewSet):
         exit_time = self._ensure_aware_dt(exit_time)
         exit_price = Decimal(str(exit_price))
 
-        policy, _ = UserSettings.objects.get_or_create(user=user)
+        policy = get_user_settings(user)
 
         # If fills are in play, make sure we have an entry fill
         if hasattr(trade, "fills"):
@@ -448,7 +465,7 @@ class TradeViewSet(viewsets.ModelViewSet):
             exit_action = TradeFill.ACTION_SELL if trade.side == "LONG" else TradeFill.ACTION_BUY
 
             if commission_override is not None:
-                fill_commission = Decimal(str(commission_override or 0)).quantize(Decimal("0.01"))
+                fill_commission = D(commission_override or 0).quantize(_CENT)
             else:
                 fill_commission = policy.commission_for_side(price=exit_price, quantity=remaining)
 
@@ -458,7 +475,7 @@ class TradeViewSet(viewsets.ModelViewSet):
                 action=exit_action,
                 quantity=remaining,
                 price=exit_price,
-                commission=Decimal(str(fill_commission or 0)).quantize(Decimal("0.01")),
+                commission=D(fill_commission or 0).quantize(_CENT),
                 note=note,
             )
 
@@ -489,6 +506,8 @@ class TradeViewSet(viewsets.ModelViewSet):
                 "commission_exit",
             ]
         )
+        # status/legacy columns changed in place: drop memoized derived values
+        trade._invalidate_cached_properties()
 
 
     def perform_update(self, serializer):
@@ -496,11 +515,9 @@ class TradeViewSet(viewsets.ModelViewSet):
         if day.user_id != self.request.user.id:
             raise PermissionDenied("Forbidden")
 
-        trade = serializer.save(user=self.request.user)
-        # If client sets status CLOSED but didn't send exit_time, set it now
-        if trade.status == "CLOSED" and not trade.exit_time:
-            trade.close(exit_price=trade.exit_price)  # will set exit_time=now()
-    
+        # TradeSerializer.update() fills a missing exit_time on close, in the same UPDATE
+        serializer.save(user=self.request.user)
+
     @action(detail=True, methods=["post"])
     def scale(self, request, pk=None):
         """
@@ -555,9 +572,9 @@ class TradeViewSet(viewsets.ModelViewSet):
             action = TradeFill.ACTION_SELL if direction == TradeScaleSerializer.DIRECTION_IN else TradeFill.ACTION_BUY
 
         # Commission per fill: default compute from user policy unless override provided.
-        policy, _ = UserSettings.objects.get_or_create(user=request.user)
+        policy = get_user_settings(request.user)
         if commission_override is not None:
-            fill_commission = Decimal(str(commission_override or 0)).quantize(Decimal("0.01"))
+            fill_commission = D(commission_override or 0).quantize(_CENT)
         else:
             fill_commission = policy.commission_for_side(price=price, quantity=qty)
 
@@ -662,7 +679,8 @@ class TradeViewSet(viewsets.ModelViewSet):
         Returns: {trades, win_rate, avg_r, best_r, worst_r, daily_loss_pct, used_daily_risk_pct}
         """
         today = timezone.localdate()
-        day = JournalDay.objects.filter(user=request.user, date=today).first()
+        # Realized P/L and adjustments come annotated (effective_equity costs no query)
+        day = JournalDay.objects.filter(user=request.user, date=today).with_aggregates().first()
         if not day:
             return Response(
                 {
@@ -678,18 +696,43 @@ class TradeViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        trades = day.trades.all()
-        closed = trades.filter(status="CLOSED")
+        # One row per trade of the day in exit order (the realized equity curve),
+        # NET P/L and R from their SQL twins. Closed trades whose fills aren't
+        # cached yet can't be valued in SQL and are folded from their fills.
+        rows = list(
+            day.trades.alias(has_fills=Exists(TradeFill.objects.filter(trade=OuterRef("pk"))))
+            .annotate(
+                uncached=ExpressionWrapper(
+                    Q(has_fills=True, realized_net_cached__isnull=True), output_field=BooleanField()
+                ),
+                net=Trade.realized_net_expression(),
+                r=Trade.r_multiple_expression(),
+            )
+            .order_by("exit_time", "id")
+            .values_list("pk", "status", "exit_time", "uncached", "net", "r")
+        )
+        folded = {}
+        uncached_pks = [row[0] for row in rows if row[1] == "CLOSED" and row[3]]
+        if uncached_pks:
+            for t in Trade.objects.filter(pk__in=uncached_pks).prefetch_related("fills"):
+                folded[t.pk] = (t.realized_pnl, t.r_multiple)
+
         r_list = []
         realized_pnl = 0.0
-        for t in closed:
-            r = t.r_multiple
+        curve = []  # realized P/L of closed trades with an exit_time, in exit order
+        for pk, status_, exit_time, uncached, net, r in rows:
+            if status_ != "CLOSED":
+                continue
+            if uncached:
+                pnl, r = folded[pk]
+            else:
+                pnl = float(net or 0)
+                r = float(r) if r is not None else None
+            realized_pnl += pnl
             if r is not None:
                 r_list.append(r)
-            try:
-                realized_pnl += float(t.realized_pnl or 0.0)
-            except Exception:
-                continue
+            if exit_time is not None:
+                curve.append(pnl)
 
         wins = sum(1 for r in r_list if r > 0)
         total = len(r_list)
@@ -712,19 +755,8 @@ class TradeViewSet(viewsets.ModelViewSet):
         peak_eq = running_eq
         max_dd = 0.0
 
-        # Closed trades ordered by exit_time represent the realized equity curve for the day
-        closed_for_curve = (
-            day.trades.filter(status="CLOSED")
-            .exclude(exit_time__isnull=True)
-            .order_by("exit_time", "id")
-        )
-
-        for t in closed_for_curve:
-            try:
-                running_eq += float(t.realized_pnl or 0.0)
-            except Exception:
-                continue
-            
+        for pnl in curve:
+            running_eq += pnl
             if running_eq > peak_eq:
                 peak_eq = running_eq
 
@@ -736,7 +768,7 @@ class TradeViewSet(viewsets.ModelViewSet):
 
         return Response(
             {
-                "trades": trades.count(),
+                "trades": len(rows),
                 "win_rate": win_rate,
                 "avg_r": avg_r,
                 "best_r": best_r,
@@ -762,24 +794,13 @@ class TradeViewSet(viewsets.ModelViewSet):
         """
         user = request.user
         today = timezone.localdate()
-        day = JournalDay.objects.filter(user=user, date=today).first()
+        day = JournalDay.objects.filter(user=user, date=today).with_aggregates().first()
 
-        # Realized P/L today = sum over CLOSED trades for today's JournalDay
-        pl_today = 0.0
-        if day:
-            for t in day.trades.filter(status="CLOSED"):
-                try:
-                    pl_today += float(t.realized_pnl or 0.0)
-                except Exception:
-                    continue
+        # Realized P/L today = sum over CLOSED trades for today's JournalDay (annotated)
+        pl_today = float(day.realized_pnl_decimal) if day else 0.0
 
-        # Total realized P/L across all closed trades for this user
-        pl_total = 0.0
-        for t in Trade.objects.filter(user=user, status="CLOSED"):
-            try:
-                pl_total += float(t.realized_pnl or 0.0)
-            except Exception:
-                continue
+        # Total realized P/L across all closed trades for this user (one aggregate)
+        pl_total = float(Trade.realized_net_total(Trade.objects.filter(user=user, status="CLOSED")))
 
         equity_today = float(day.effective_equity or 0.0) if day else 0.0
         # naive last-close equity: yesterday's day_start_equity if present
@@ -865,6 +886,18 @@ class StrategyTagViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return StrategyTag.objects.all()
 
+    def list(self, request, *args, **kwargs):
+        # Same payload for every user: serialize the whole (small) table once and
+        # paginate the cached rows; journal.signals drops the entry on tag changes
+        data = cache.get(STRATEGY_TAGS_CACHE_KEY)
+        if data is None:
+            data = list(self.get_serializer(self.get_queryset(), many=True).data)
+            cache.set(STRATEGY_TAGS_CACHE_KEY, data, STRATEGY_TAGS_CACHE_TTL)
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
 
 class AttachmentViewSet(
     mixins.ListModelMixin,
@@ -952,45 +985,70 @@ class PnLViewSet(viewsets.ViewSet):
         except ValueError:
             return Response({"detail": "Invalid date format."}, status=400)
 
-        # NOTE: With scaling (TradeFill), SQL expressions over entry/exit fields become incorrect.
-        # We compute per-trade NET P/L using the model property `realized_pnl` (supports fills),
-        # then aggregate per day in Python for correctness.
-
-        out = []
-        cursor = start_date
-        while cursor <= end_date:
-            day_trades = Trade.objects.filter(
+        # One grouped query for the whole range. Per-trade NET P/L and R use the
+        # fill-aware SQL twins of the model properties (Trade.realized_net_expression /
+        # r_multiple_expression; a NULL R counts as 0 as before). Trades with fills
+        # but no cached values yet can't be valued in SQL: they are only counted
+        # here and folded in Python below.
+        closed = (
+            Trade.objects.filter(
                 user=request.user,
                 status="CLOSED",
-                journal_day__date=cursor,
+                journal_day__date__gte=start_date,
+                journal_day__date__lte=end_date,
             )
+            .alias(has_fills=Exists(TradeFill.objects.filter(trade=OuterRef("pk"))))
+            .order_by()
+        )
+        uncached_q = Q(has_fills=True, realized_net_cached__isnull=True)
+        rows = (
+            closed.alias(r=Coalesce(Trade.r_multiple_expression(), Value(_ZERO)))
+            .values(day=F("journal_day__date"))
+            .annotate(
+                trades=Count("pk"),
+                uncached=Count("pk", filter=uncached_q),
+                pl=Sum(Trade.realized_net_expression(), filter=~uncached_q),
+                r_sum=Sum("r", filter=~uncached_q),
+                best_r=Max("r", filter=~uncached_q),
+                worst_r=Min("r", filter=~uncached_q),
+                wins=Count("pk", filter=~uncached_q & Q(r__gt=0)),
+            )
+        )
+        by_day = {row["day"]: row for row in rows}
+
+        # (pl, r) of the uncached trades per day, from their fills
+        folded = defaultdict(list)
+        if any(row["uncached"] for row in by_day.values()):
+            uncached = (
+                closed.filter(uncached_q)
+                .annotate(day=F("journal_day__date"))
+                .prefetch_related("fills")
+            )
+            for t in uncached:
+                folded[t.day].append((t.realized_pnl, float(t.r_multiple or 0.0)))
 
-            trades_count = day_trades.count()
-            pl_val = 0.0
-            r_list = []
-            wins = 0
-
-            for t in day_trades:
-                try:
-                    pl_val += float(t.realized_pnl or 0.0)
-                except Exception:
-                    pass
-
-                r_val = getattr(t, "r", None)
-                if r_val is None:
-                    r_val = getattr(t, "r_multiple", None)
-                try:
-                    r_f = float(r_val) if r_val is not None else 0.0
-                except Exception:
-                    r_f = 0.0
-                r_list.append(r_f)
+        out = []
+        cursor = start_date
+        while cursor <= end_date:
+            row = by_day.get(cursor)
+            extra = folded.get(cursor, ())
+            trades_count = row["trades"] if row else 0
+
+            pl_val = float(row["pl"] or 0) if row else 0.0
+            r_sum = float(row["r_sum"] or 0) if row else 0.0
+            wins = row["wins"] if row else 0
+            r_bounds = [float(row[k]) for k in ("best_r", "worst_r") if row and row[k] is not None]
+            for pl, r_f in extra:
+                pl_val += pl
+                r_sum += r_f
+                r_bounds.append(r_f)
                 if r_f > 0:
                     wins += 1
 
-            if r_list:
-                avg_r = sum(r_list) / len(r_list)
-                best_r = max(r_list)
-                worst_r = min(r_list)
+            if trades_count:
+                avg_r = r_sum / trades_count
+                best_r = max(r_bounds)
+                worst_r = min(r_bounds)
             else:
                 avg_r = 0.0
                 best_r = 0.0
@@ -1010,7 +1068,6 @@ class PnLViewSet(viewsets.ViewSet):
                     "max_dd_pct": 0.0,  # placeholder; can be computed from equity path
                 }
             )
-            from datetime import timedelta
             cursor = cursor + timedelta(days=1)
 
         return Response(out)
\ No newline at end of file